@@ -0,0 +1,160 @@
+"""
+Ambiente vetorizado: N episódios avançando juntos, em lock-step.
+
+Cada episódio é uma linha de arrays empilhados do NumPy (grid, pontos de
+interesse, tabela de trechos, posição, bateria, carga, pontuação e máscaras
+dos pacotes e metas restantes), carregados de um armazém (armazem.py). Um
+passo do ambiente é um trecho inteiro: a ação de cada episódio é o índice do
+ponto de interesse de destino, e pontuação, bateria e recargas do trecho vêm
+da forma fechada de main.custo_trecho aplicada a todos os episódios de uma vez.
+
+Os trechos são os da TabelaDistancias do armazém (A* de MazeSimulado). O Maze
+percorre os caminhos do próprio A*, que em empates pode escolher outro caminho
+de mesmo comprimento e passar (ou não) pelo recharger; nesses casos as métricas
+de um episódio podem diferir das de Maze.game_loop.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from armazem import Armazem
+from geracao import PACOTES, METAS, JOGADOR, NUM_PACOTES, NUM_METAS
+
+BATERIA_INICIAL = 70  # BasePlayer.battery
+BATERIA_RECARGA = 60  # Maze._atualizar_estado
+TOTAL_ITENS = 4       # World.total_items
+
+
+def custo_trecho_vetorizado(bateria, comprimento, indice_recarga):
+    """main.custo_trecho para arrays: (pontuação, bateria final) de cada trecho."""
+    def sem_recarga(bateria, comprimento):
+        com_carga = np.minimum(np.maximum(bateria, 0), comprimento)
+        return -com_carga - 5 * (comprimento - com_carga), bateria - comprimento
+
+    recarrega = indice_recarga >= 0
+    ate_recarga = np.where(recarrega, indice_recarga + 1, comprimento)
+    score, bateria_final = sem_recarga(bateria, ate_recarga)
+    score_resto, bateria_resto = sem_recarga(BATERIA_RECARGA, comprimento - ate_recarga)
+    return np.where(recarrega, score + score_resto, score), np.where(recarrega, bateria_resto, bateria_final)
+
+
+class AmbienteVetorizado:
+    """
+    Episódios em lote sobre os mundos de um armazém. reset(seeds) inicia um
+    episódio por seed; step(acoes) leva cada episódio ao ponto de interesse
+    acoes[i] (índice em 'pontos'), como um trecho de Maze.game_loop seguido de
+    Maze._processar_alvo.
+    """
+    def __init__(self, armazem):
+        self.armazem = armazem if isinstance(armazem, Armazem) else Armazem(armazem)
+
+    def reset(self, seeds):
+        indices = [self.armazem.indice_seed[int(seed)] for seed in seeds]
+        registros = self.armazem.dados[indices]
+        n = len(indices)
+        self.seeds = registros['seed']
+        self.mapas = registros['mapa']
+        self.pontos = registros['pontos'].astype(np.int64)
+        self.comprimentos = registros['comprimentos'].astype(np.int64)
+        self.indices_recarga = registros['indices_recarga'].astype(np.int64)
+
+        self.posicao = np.full(n, JOGADOR)  # Índice do ponto de interesse onde o jogador está
+        self.bateria = np.full(n, BATERIA_INICIAL)
+        self.carga = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.passos = np.zeros(n, dtype=np.int64)
+        self.recargas = np.zeros(n, dtype=np.int64)
+        self.entregas = np.zeros(n, dtype=np.int64)
+        self.pacotes = np.ones((n, NUM_PACOTES), dtype=bool)
+        self.metas = np.ones((n, NUM_METAS), dtype=bool)
+        self.terminado = np.zeros(n, dtype=bool)
+        self.travado = np.zeros(n, dtype=bool)  # Alvo inalcançável: o Maze ficaria parado
+        return self
+
+    def step(self, acoes):
+        """
+        Aplica um trecho em cada episódio não terminado. Retorna (variação da
+        pontuação, terminado), ambos com uma entrada por episódio.
+        """
+        acoes = np.asarray(acoes, dtype=np.int64)
+        linhas = np.arange(len(acoes))
+        comprimento = self.comprimentos[linhas, self.posicao, acoes]
+        indice_recarga = self.indices_recarga[linhas, self.posicao, acoes]
+
+        # Sem caminho (ou origem == destino) o Maze não anda: o episódio não avança mais
+        ativos = ~self.terminado
+        self.travado |= ativos & (comprimento <= 0)
+        ativos &= comprimento > 0
+
+        score, bateria = custo_trecho_vetorizado(self.bateria, comprimento, indice_recarga)
+        recompensa = np.where(ativos, score, 0)
+        self.bateria = np.where(ativos, bateria, self.bateria)
+        self.passos += np.where(ativos, comprimento, 0)
+        self.recargas += ativos & (indice_recarga >= 0)
+        self.posicao = np.where(ativos, acoes, self.posicao)
+
+        # Coleta e entrega (Maze._processar_alvo)
+        pacote = acoes - PACOTES.start
+        coleta = ativos & (pacote >= 0) & (pacote < NUM_PACOTES)
+        coleta[coleta] = self.pacotes[linhas[coleta], pacote[coleta]]
+        self.pacotes[linhas[coleta], pacote[coleta]] = False
+        self.carga += coleta
+
+        meta = acoes - METAS.start
+        entrega = ativos & ~coleta & (meta >= 0) & (meta < NUM_METAS) & (self.carga > 0)
+        entrega[entrega] = self.metas[linhas[entrega], meta[entrega]]
+        self.metas[linhas[entrega], meta[entrega]] = False
+        self.carga -= entrega
+        self.entregas += entrega
+        recompensa += 50 * entrega
+
+        self.score += recompensa
+        self.terminado |= (self.entregas >= TOTAL_ITENS) | self.travado
+        return recompensa, self.terminado
+
+    def executar(self, politica, max_trechos=100):
+        """Roda a política até todos os episódios terminarem (ou max_trechos passos)."""
+        for _ in range(max_trechos):
+            if self.terminado.all():
+                break
+            self.step(politica(self))
+        return self
+
+
+def politica_gulosa(ambiente):
+    """
+    DefaultPlayer para todos os episódios de uma vez: sem carga, o pacote
+    restante mais próximo em distância de Manhattan; com carga (ou sem pacotes),
+    a meta restante mais próxima. Empates ficam com o primeiro da lista.
+    """
+    linhas = np.arange(len(ambiente.posicao))
+    posicao = ambiente.pontos[linhas, ambiente.posicao]
+    manhattan = np.abs(ambiente.pontos - posicao[:, None, :]).sum(axis=2)
+    dist_pacotes = np.where(ambiente.pacotes, manhattan[:, PACOTES], np.iinfo(np.int64).max)
+    dist_metas = np.where(ambiente.metas, manhattan[:, METAS], np.iinfo(np.int64).max)
+    busca_pacote = (ambiente.carga == 0) & ambiente.pacotes.any(axis=1)
+    return np.where(
+        busca_pacote,
+        PACOTES.start + dist_pacotes.argmin(axis=1),
+        METAS.start + dist_metas.argmin(axis=1),
+    )
+
+
+# ==========================
+# PONTO DE ENTRADA PRINCIPAL
+# ==========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roda a política gulosa em lote sobre um armazém de mundos.")
+    parser.add_argument("armazem", help="Arquivo .npy gravado por armazem.escrever_armazem.")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Quantas vezes rodar todas as seeds.")
+    args = parser.parse_args()
+
+    ambiente = AmbienteVetorizado(args.armazem)
+    seeds = np.tile(ambiente.armazem.dados['seed'], args.repeticoes)
+    inicio = time.perf_counter()
+    ambiente.reset(seeds).executar(politica_gulosa)
+    duracao = time.perf_counter() - inicio
+    print(f"Episódios: {len(seeds)}, Pontuação média: {ambiente.score.mean():.2f}, "
+          f"Passos médios: {ambiente.passos.mean():.2f}, Travados: {int(ambiente.travado.sum())}")
+    print(f"Tempo: {duracao:.3f}s ({len(seeds) / duracao:.0f} episódios/s)")
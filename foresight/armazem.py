@@ -0,0 +1,121 @@
+"""
+Armazém compartilhado de mundos para os workers de simulacao.py.
+
+Uma etapa prévia grava, para cada seed, o grid, as coordenadas dos pontos de
+interesse e a tabela de trechos entre todos os pares desses pontos
+(main.TabelaDistancias) em um único arquivo .npy. Os workers abrem o arquivo
+mapeado em memória e somente leitura: as páginas são compartilhadas pelo
+sistema operacional entre todos os processos, então a memória por worker não
+cresce com o número de workers e nenhum deles regenera mundos ou refaz o A*
+entre pontos de interesse.
+
+O nome do arquivo leva a versão do código que gera os mundos e os trechos
+(main.py, geracao.py e armazem.py) e a origem dos mundos: qualquer mudança
+nesses módulos aponta para outro arquivo, que é recalculado, em vez de
+reaproveitar tabelas antigas.
+"""
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import geracao
+import main
+from geracao import DTYPE_MUNDO, NUM_PONTOS, gerar_mundos, layout_do_registro
+from main import World, TabelaDistancias
+
+DTYPE_ARMAZEM = np.dtype(DTYPE_MUNDO.descr + [
+    ('comprimentos', np.int16, (NUM_PONTOS, NUM_PONTOS)),     # -1 se inalcançável
+    ('indices_recarga', np.int16, (NUM_PONTOS, NUM_PONTOS)),  # -1 se não passa pelo recharger
+])
+
+
+def versao_modulos(modulos):
+    """SHA-256 (hex) do código-fonte dos módulos, na ordem dada."""
+    soma = hashlib.sha256()
+    for modulo in modulos:
+        with open(modulo.__file__, 'rb') as arquivo:
+            soma.update(arquivo.read())
+    return soma.hexdigest()
+
+
+def caminho_versionado(caminho, lote=False):
+    """'armazem.npy' -> 'armazem-<versão>.npy' para o código atual e a origem dos mundos."""
+    versao = versao_modulos([main, geracao, sys.modules[__name__]])
+    versao = hashlib.sha256(f'{versao}:{"lote" if lote else "seed"}'.encode()).hexdigest()
+    raiz, extensao = os.path.splitext(caminho)
+    return f'{raiz}-{versao[:12]}{extensao}'
+
+
+def _calcular_registro(args):
+    """Calcula os campos de uma seed; roda nos processos da etapa prévia."""
+    seed, layout = args
+    world = World(seed, visual=False, layout=layout)
+    tabela = TabelaDistancias.calcular(world)
+    return seed, world.map, tabela.pontos, tabela.comprimentos, tabela.indices_recarga
+
+
+def escrever_armazem(seeds, caminho, lote=False, paralelo=True):
+    """
+    Grava o armazém das seeds em caminho_versionado(caminho, lote) e retorna esse
+    caminho. Com lote=False os mundos são os de World(seed) (os mesmos dos CSVs);
+    com lote=True vêm de geracao.gerar_mundos. Se o arquivo já existir com
+    exatamente essas seeds, é reaproveitado.
+    """
+    seeds = [int(seed) for seed in seeds]
+    caminho = caminho_versionado(caminho, lote)
+    if os.path.exists(caminho):
+        existente = np.load(caminho, mmap_mode='r')
+        if existente.dtype == DTYPE_ARMAZEM and np.array_equal(existente['seed'], seeds):
+            return caminho
+        del existente
+
+    if lote:
+        mundos = gerar_mundos(seeds)
+        tarefas = [(int(mundos[i]['seed']), layout_do_registro(mundos[i])) for i in range(len(mundos))]
+    else:
+        tarefas = [(seed, None) for seed in seeds]
+
+    destino = np.lib.format.open_memmap(caminho, mode='w+', dtype=DTYPE_ARMAZEM, shape=(len(seeds),))
+    if paralelo:
+        with ProcessPoolExecutor() as executor:
+            registros = executor.map(_calcular_registro, tarefas, chunksize=64)
+            _gravar(destino, registros)
+    else:
+        _gravar(destino, map(_calcular_registro, tarefas))
+    destino.flush()
+    del destino
+    return caminho
+
+
+def _gravar(destino, registros):
+    for i, (seed, mapa, pontos, comprimentos, indices_recarga) in enumerate(registros):
+        destino[i]['seed'] = seed
+        destino[i]['mapa'] = mapa
+        destino[i]['pontos'] = pontos
+        destino[i]['comprimentos'] = comprimentos
+        destino[i]['indices_recarga'] = indices_recarga
+
+
+class Armazem:
+    """Acesso somente leitura, sem cópia, a um arquivo gravado por escrever_armazem."""
+    def __init__(self, caminho):
+        self.dados = np.load(caminho, mmap_mode='r')
+        self.indice_seed = {int(seed): i for i, seed in enumerate(self.dados['seed'])}
+
+    def __contains__(self, seed):
+        return seed in self.indice_seed
+
+    def layout(self, seed):
+        """Layout no formato de World(layout=...)."""
+        return layout_do_registro(self.dados[self.indice_seed[seed]])
+
+    def tabela(self, seed):
+        registro = self.dados[self.indice_seed[seed]]
+        return TabelaDistancias(
+            registro['pontos'].tolist(),
+            registro['comprimentos'].tolist(),
+            registro['indices_recarga'].tolist(),
+        )
@@ -0,0 +1,79 @@
+"""
+Cache persistente de resultados de simulação, endereçado por conteúdo.
+
+Cada resultado é guardado em um arquivo JSON cujo nome é o SHA-256 da
+configuração do episódio (seed, profundidade, modo de recálculo, classe do
+jogador e seus parâmetros, orçamento de nós, origem dos mundos) junto com o
+hash do código da simulação (MODULOS_SIMULACAO). Varreduras que se sobrepõem só
+calculam as células que faltam, e qualquer mudança nesses módulos muda todas as
+chaves, invalidando o cache automaticamente.
+
+Os resultados guardados mantêm o tempo_execucao da execução que os calculou;
+por isso o cache é opcional em simulacao.py (DIRETORIO_CACHE).
+
+A gravação usa um arquivo temporário seguido de os.replace, de modo que vários
+processos ou threads podem ler e gravar o mesmo diretório ao mesmo tempo.
+"""
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+
+import main
+from armazem import versao_modulos
+
+# Módulos de que dependem os resultados de simulacao.executar_simulacao
+MODULOS_SIMULACAO = ('main', 'simulacao', 'armazem', 'geracao', 'replanejamento')
+
+_versao_codigo = None
+
+
+def versao_codigo():
+    """SHA-256 do código de MODULOS_SIMULACAO, calculado uma vez por processo."""
+    global _versao_codigo
+    if _versao_codigo is None:
+        # Importados aqui: simulacao importa este módulo
+        _versao_codigo = versao_modulos([importlib.import_module(nome) for nome in MODULOS_SIMULACAO])
+    return _versao_codigo
+
+
+def chave(seed, profundidade, recalcular_por_movimento, jogador, largura_feixe=0, iteracoes_mcts=0, mundos='seed', orcamento_nos=0):
+    """Endereço (hex) de um episódio; 'mundos' diz de onde vêm os layouts ('seed' ou 'lote')."""
+    configuracao = {
+        'seed': seed,
+        'profundidade': profundidade,
+        'recalcular_por_movimento': bool(recalcular_por_movimento),
+        'jogador': main.JOGADORES[jogador].__name__,
+        'largura_feixe': largura_feixe,
+        'iteracoes_mcts': iteracoes_mcts,
+        'orcamento_nos': orcamento_nos,
+        'mundos': mundos,
+        'codigo': versao_codigo(),
+    }
+    return hashlib.sha256(json.dumps(configuracao, sort_keys=True).encode()).hexdigest()
+
+
+class CacheResultados:
+    """Diretório de resultados, um arquivo por chave (subdiretórios pelos dois primeiros caracteres)."""
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave[:2], chave + '.json')
+
+    def ler(self, chave):
+        """Resultado guardado, ou None se ainda não foi calculado."""
+        try:
+            with open(self._caminho(chave)) as arquivo:
+                return json.load(arquivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def gravar(self, chave, resultado):
+        caminho = self._caminho(chave)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+        with os.fdopen(descritor, 'w') as arquivo:
+            json.dump(resultado, arquivo)
+        os.replace(temporario, caminho)
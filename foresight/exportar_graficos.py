@@ -0,0 +1,178 @@
+"""
+Exporta, de uma vez, todos os gráficos de um arquivo de resultados.
+
+Substitui a sequência de fig.show() de plot.py, plotNovo.py, plothuge.py e
+plotTempo.py por figuras gravadas direto em disco (PNG via kaleido ou HTML),
+geradas em paralelo, uma por processo:
+
+ - uma figura por métrica com uma série por profundidade ao longo das seeds e
+   as médias anotadas à direita (como plotNovo.py);
+ - uma figura com o tempo médio de execução por profundidade (como plotTempo.py).
+
+Acima de LIMITE_PONTOS linhas por série, o traço vira go.Scattergl (WebGL) e a
+série é reduzida no servidor por decimação min/max: o eixo das seeds é dividido
+em baldes e de cada balde ficam só os pontos de mínimo e de máximo, o que
+preserva picos e vales com no máximo LIMITE_PONTOS pontos por série.
+
+Uso:
+  python exportar_graficos.py resultadosBIGSIM4depth10000seedssmart.csv
+  python exportar_graficos.py resultados*.csv --formato html
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+LIMITE_PONTOS = 5000  # Pontos por série acima dos quais usa WebGL e decimação
+
+# (coluna, título, sufixo do arquivo)
+METRICAS = [
+    ('pontuacao', 'Pontuação', 'Score'),
+    ('tempo_execucao', 'Tempo de Execução (s)', 'Time'),
+    ('bateria_final', 'Bateria Final', 'BateriaFinal'),
+    ('recargas', 'Número de Recargas', 'NumRecargas'),
+    ('passos', 'Número de Passos', 'NumPassos'),
+]
+
+_tabelas = {}  # Resultados já lidos em cada processo, por arquivo
+
+
+def decimar_min_max(x, y, limite=LIMITE_PONTOS):
+    """
+    Índices dos pontos mantidos de uma série ordenada por x: todos se couberem
+    no limite; senão, o mínimo e o máximo de y em cada um de limite // 2 baldes
+    de mesma largura no eixo x (intervalos de seeds), na ordem original.
+    """
+    n = len(y)
+    if n <= limite:
+        return np.arange(n)
+    x = np.asarray(x)
+    y = np.asarray(y)
+    # Posições onde começa cada balde (x ordenado): baldes vazios, em lacunas de x, ficam sem pontos
+    limites_x = np.linspace(x[0], x[-1], limite // 2 + 1)[1:-1]
+    bordas = np.concatenate(([0], np.searchsorted(x, limites_x, side='left'), [n]))
+    indices = []
+    for inicio, fim in zip(bordas[:-1], bordas[1:]):
+        if fim > inicio:
+            trecho = y[inicio:fim]
+            indices.append(inicio + int(np.argmin(trecho)))
+            indices.append(inicio + int(np.argmax(trecho)))
+    return np.unique(indices)
+
+
+def _ler(arquivo):
+    import pandas as pd
+    if arquivo not in _tabelas:
+        _tabelas[arquivo] = pd.read_csv(arquivo)
+    return _tabelas[arquivo]
+
+
+def _adicionar_media(fig, df, coluna):
+    """Médias por profundidade anotadas à direita do gráfico, como em plotNovo.py."""
+    medias = df.groupby("profundidade")[coluna].mean()
+    fig.update_layout(annotations=[
+        dict(
+            xref="paper", yref="y",
+            x=1.05, y=media,
+            text=f"Prof {profundidade}: {media:.2f}",
+            showarrow=False,
+            font=dict(size=12, color="black"),
+            align="left",
+        )
+        for profundidade, media in medias.items()
+    ])
+
+
+def figura_por_seed(df, coluna, titulo, nome, limite=LIMITE_PONTOS):
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for profundidade in sorted(df["profundidade"].unique()):
+        subset = df[df["profundidade"] == profundidade].sort_values("seed")
+        if len(subset) > limite:
+            mantidos = decimar_min_max(subset["seed"].to_numpy(), subset[coluna].to_numpy(), limite)
+            subset = subset.iloc[mantidos]
+            traco = go.Scattergl
+            modo = "lines"
+        else:
+            traco = go.Scatter
+            modo = "lines+markers"
+        fig.add_trace(traco(x=subset["seed"], y=subset[coluna], mode=modo, name=f"Profundidade {profundidade}"))
+    fig.update_layout(
+        title=f"{titulo} por Seed e Profundidade ({nome})",
+        xaxis_title="Seed",
+        yaxis_title=titulo,
+        legend_title="Profundidade",
+        template="plotly_white",
+    )
+    _adicionar_media(fig, df, coluna)
+    return fig
+
+
+def figura_tempo_por_profundidade(df, nome):
+    import plotly.graph_objects as go
+    medias_tempo = df.groupby("profundidade")["tempo_execucao"].mean()
+    fig = go.Figure(go.Scatter(
+        x=medias_tempo.index,
+        y=medias_tempo.values,
+        mode="markers+lines",
+        name="Dados Reais",
+        marker=dict(size=8, color="blue"),
+        line=dict(dash="solid", color="blue"),
+    ))
+    fig.update_layout(
+        title=f"Relação entre Profundidade e Tempo de Execução ({nome})",
+        xaxis_title="Profundidade",
+        yaxis_title="Tempo Médio de Execução (s)",
+        legend_title="Legenda",
+        template="plotly_white",
+    )
+    return fig
+
+
+def exportar_figura(tarefa):
+    """Monta e grava uma figura; roda nos processos do pool. Retorna o caminho gravado."""
+    arquivo, coluna, formato, destino, limite = tarefa
+    df = _ler(arquivo)
+    nome = os.path.basename(arquivo)
+    prefixo = os.path.join(destino, os.path.splitext(nome)[0])
+    if coluna is None:
+        fig = figura_tempo_por_profundidade(df, nome)
+        caminho = f"{prefixo}TempoPorProfundidade.{formato}"
+    else:
+        titulo, sufixo = next((t, s) for c, t, s in METRICAS if c == coluna)
+        fig = figura_por_seed(df, coluna, titulo, nome, limite)
+        caminho = f"{prefixo}{sufixo}.{formato}"
+    if formato == "html":
+        fig.write_html(caminho, include_plotlyjs="cdn")
+    else:
+        fig.write_image(caminho, width=1400, height=700)
+    return caminho
+
+
+def exportar(arquivos, formato="png", destino="graficos", limite=LIMITE_PONTOS, processos=None):
+    """Grava todas as figuras de todos os arquivos em 'destino', em paralelo."""
+    os.makedirs(destino, exist_ok=True)
+    tarefas = [
+        (arquivo, coluna, formato, destino, limite)
+        for arquivo in arquivos
+        for coluna in [c for c, _, _ in METRICAS] + [None]
+    ]
+    with ProcessPoolExecutor(processos) as executor:
+        return list(executor.map(exportar_figura, tarefas))
+
+
+# ==========================
+# PONTO DE ENTRADA PRINCIPAL
+# ==========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta em paralelo todos os gráficos de arquivos de resultados.")
+    parser.add_argument("arquivos", nargs="+", help="CSVs gerados por simulacao.py.")
+    parser.add_argument("--formato", choices=["png", "html"], default="png", help="PNG (kaleido) ou HTML interativo.")
+    parser.add_argument("--destino", default="graficos", help="Diretório de saída.")
+    parser.add_argument("--limite", type=int, default=LIMITE_PONTOS, help="Pontos por série antes de usar WebGL e decimação.")
+    parser.add_argument("--processos", type=int, default=None, help="Processos em paralelo (padrão: núcleos).")
+    args = parser.parse_args()
+
+    for caminho in exportar(args.arquivos, args.formato, args.destino, args.limite, args.processos):
+        print(caminho)
@@ -0,0 +1,287 @@
+"""
+Distribuição da varredura de simulacao.py por uma fila de tarefas em SQLite.
+
+O coordenador grava a grade de tarefas de simulacao.montar_tarefas em um
+arquivo SQLite (em um diretório compartilhado entre as máquinas). Qualquer
+número de workers, em qualquer máquina, aluga lotes de tarefas por um tempo
+limitado, renova o aluguel periodicamente (heartbeat) enquanto simula e grava
+cada resultado no próprio arquivo. Aluguéis vencidos (worker morto ou máquina
+fora do ar) voltam a ficar disponíveis e são alugados por outro worker; o
+resultado de um aluguel vencido que chegue atrasado é descartado. Uma tarefa
+cujo aluguel vence MAX_TENTATIVAS vezes (p.ex. uma que derruba o worker) é
+marcada como 'falhou' e não é mais alugada; o mesmo vale para uma tarefa cuja
+simulação termina em erro (resultado None), que antes disso volta a ficar
+pendente para ser tentada de novo. Cada tarefa da grade aparece uma
+única vez na fila: criar de novo com a mesma grade não duplica nada.
+
+O SQLite depende do travamento de arquivos do sistema: em diretórios de rede
+use um sistema de arquivos com locks confiáveis (p.ex. NFSv4), sem WAL.
+
+Uso:
+  python fila.py criar fila.db               # Coordenador: grava a grade de tarefas
+  python fila.py worker fila.db              # Em cada máquina, quantos quiser
+  python fila.py local fila.db --workers 4   # Vários workers locais, como se fossem máquinas
+  python fila.py status fila.db
+  python fila.py exportar fila.db            # CSVs de resultados, como simulacao.py
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+DURACAO_ALUGUEL = 60.0  # segundos sem heartbeat até o aluguel vencer
+TAMANHO_LOTE = 20       # tarefas por aluguel
+MAX_TENTATIVAS = 3      # aluguéis vencidos até a tarefa ser dada como falha
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    id INTEGER PRIMARY KEY,
+    seed INTEGER NOT NULL,
+    profundidade INTEGER NOT NULL,
+    recalcular_por_movimento INTEGER NOT NULL,
+    jogador TEXT NOT NULL,
+    largura_feixe INTEGER NOT NULL,
+    iteracoes_mcts INTEGER NOT NULL,
+    orcamento_nos INTEGER NOT NULL DEFAULT 0,
+    estado TEXT NOT NULL DEFAULT 'pendente',  -- pendente, alugada, concluida ou falhou
+    aluguel TEXT,
+    dono TEXT,
+    expira REAL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    resultado TEXT                             -- JSON de executar_simulacao (null se falhou)
+);
+CREATE INDEX IF NOT EXISTS tarefas_estado ON tarefas (estado, id);
+CREATE INDEX IF NOT EXISTS tarefas_aluguel ON tarefas (aluguel);
+"""
+
+# Colunas acrescentadas depois da primeira versão do esquema, com a definição usada
+# para incluí-las em filas já existentes
+MIGRACOES = [
+    ('orcamento_nos', 'INTEGER NOT NULL DEFAULT 0'),
+]
+
+# Colunas que identificam uma tarefa (argumentos de simulacao.executar_tarefa)
+CAMPOS_TAREFA = 'seed, profundidade, recalcular_por_movimento, jogador, largura_feixe, iteracoes_mcts, orcamento_nos'
+
+
+def conectar(caminho):
+    # isolation_level=None: as transações são abertas explicitamente com BEGIN IMMEDIATE
+    conexao = sqlite3.connect(caminho, timeout=60, isolation_level=None)
+    conexao.execute('PRAGMA busy_timeout = 60000')
+    return conexao
+
+
+class FilaTarefas:
+    """Fila de tarefas com aluguéis, sobre um arquivo SQLite compartilhado."""
+    def __init__(self, caminho, duracao_aluguel=DURACAO_ALUGUEL, max_tentativas=MAX_TENTATIVAS):
+        self.caminho = caminho
+        self.duracao_aluguel = duracao_aluguel
+        self.max_tentativas = max_tentativas
+        self.conexao = conectar(caminho)
+        self.conexao.executescript(ESQUEMA)
+        self._migrar()
+
+    def _migrar(self):
+        """Acrescenta a uma fila criada por uma versão anterior as colunas que faltam."""
+        with self._transacao():
+            colunas = {linha[1] for linha in self.conexao.execute('PRAGMA table_info(tarefas)')}
+            for coluna, definicao in MIGRACOES:
+                if coluna not in colunas:
+                    self.conexao.execute(f'ALTER TABLE tarefas ADD COLUMN {coluna} {definicao}')
+            indices = {linha[1] for linha in self.conexao.execute('PRAGMA index_list(tarefas)')}
+            if 'tarefas_unicas' not in indices:
+                # Filas antigas podem ter a grade duplicada: fica uma linha por tarefa,
+                # a concluída se houver
+                self.conexao.execute(
+                    f"DELETE FROM tarefas WHERE id NOT IN ("
+                    f"SELECT COALESCE(MIN(CASE WHEN estado = 'concluida' THEN id END), MIN(id)) "
+                    f"FROM tarefas GROUP BY {CAMPOS_TAREFA})"
+                )
+                self.conexao.execute(f'CREATE UNIQUE INDEX tarefas_unicas ON tarefas ({CAMPOS_TAREFA})')
+
+    def criar(self, tarefas):
+        """
+        Acrescenta tarefas (tuplas na ordem de simulacao.executar_tarefa); as que
+        já estão na fila são ignoradas. Retorna quantas foram acrescentadas.
+        """
+        with self._transacao():
+            return self.conexao.executemany(
+                f'INSERT OR IGNORE INTO tarefas ({CAMPOS_TAREFA}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                tarefas,
+            ).rowcount
+
+    def alugar(self, dono, quantidade=TAMANHO_LOTE):
+        """
+        Aluga até 'quantidade' tarefas pendentes ou com aluguel vencido. Retorna
+        (id do aluguel, [(id, tarefa), ...]); a lista vazia indica que não havia nada livre.
+        """
+        aluguel = uuid.uuid4().hex
+        agora = time.time()
+        with self._transacao():
+            # Aluguéis vencidos pela última tentativa: a tarefa não volta para a fila
+            self.conexao.execute(
+                "UPDATE tarefas SET estado = 'falhou', expira = NULL "
+                "WHERE estado = 'alugada' AND expira < ? AND tentativas >= ?",
+                (agora, self.max_tentativas),
+            )
+            # Primeiro os aluguéis vencidos, depois as pendentes (ambas pelo índice de estado)
+            ids = [linha[0] for linha in self.conexao.execute(
+                "SELECT id FROM tarefas WHERE estado = 'alugada' AND expira < ? ORDER BY id LIMIT ?",
+                (agora, quantidade),
+            )]
+            ids += [linha[0] for linha in self.conexao.execute(
+                "SELECT id FROM tarefas WHERE estado = 'pendente' ORDER BY id LIMIT ?",
+                (quantidade - len(ids),),
+            )]
+            self.conexao.executemany(
+                "UPDATE tarefas SET estado = 'alugada', aluguel = ?, dono = ?, expira = ?, tentativas = tentativas + 1 WHERE id = ?",
+                [(aluguel, dono, agora + self.duracao_aluguel, id_) for id_ in ids],
+            )
+            tarefas = self.conexao.execute(
+                f'SELECT id, {CAMPOS_TAREFA} FROM tarefas WHERE aluguel = ? ORDER BY id',
+                (aluguel,),
+            ).fetchall()
+        return aluguel, [(linha[0], (linha[1], linha[2], bool(linha[3])) + linha[4:]) for linha in tarefas]
+
+    def renovar(self, aluguel):
+        """Heartbeat: estende o aluguel. Retorna quantas tarefas ainda pertencem a ele."""
+        with self._transacao():
+            return self.conexao.execute(
+                "UPDATE tarefas SET expira = ? WHERE aluguel = ? AND estado = 'alugada'",
+                (time.time() + self.duracao_aluguel, aluguel),
+            ).rowcount
+
+    def concluir(self, aluguel, id_tarefa, resultado):
+        """
+        Grava o resultado; retorna False se o aluguel venceu e a tarefa foi alugada
+        por outro. Resultado None (a simulação levantou uma exceção) não conclui a
+        tarefa: ela volta a ficar pendente, ou 'falhou' após max_tentativas aluguéis.
+        """
+        with self._transacao():
+            if resultado is None:
+                return self.conexao.execute(
+                    "UPDATE tarefas SET estado = CASE WHEN tentativas >= ? THEN 'falhou' ELSE 'pendente' END, "
+                    "aluguel = NULL, expira = NULL "
+                    "WHERE id = ? AND aluguel = ? AND estado = 'alugada'",
+                    (self.max_tentativas, id_tarefa, aluguel),
+                ).rowcount == 1
+            return self.conexao.execute(
+                "UPDATE tarefas SET estado = 'concluida', resultado = ?, expira = NULL "
+                "WHERE id = ? AND aluguel = ? AND estado = 'alugada'",
+                (json.dumps(resultado), id_tarefa, aluguel),
+            ).rowcount == 1
+
+    def contagem(self):
+        """{'pendente': n, 'alugada': n, 'vencida': n, 'concluida': n, 'falhou': n}"""
+        contagem = dict.fromkeys(('pendente', 'alugada', 'vencida', 'concluida', 'falhou'), 0)
+        consulta = "SELECT CASE WHEN estado = 'alugada' AND expira < ? THEN 'vencida' ELSE estado END, COUNT(*) FROM tarefas GROUP BY 1"
+        for estado, total in self.conexao.execute(consulta, (time.time(),)):
+            contagem[estado] = total
+        return contagem
+
+    def resultados(self):
+        """Resultados das tarefas concluídas, na ordem da grade."""
+        for (resultado,) in self.conexao.execute("SELECT resultado FROM tarefas WHERE estado = 'concluida' ORDER BY id"):
+            yield json.loads(resultado)
+
+    def _transacao(self):
+        return _Transacao(self.conexao)
+
+
+class _Transacao:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK em caso de erro): trava a escrita entre processos e máquinas."""
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def __enter__(self):
+        self.conexao.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, tipo, valor, rastro):
+        self.conexao.execute('COMMIT' if tipo is None else 'ROLLBACK')
+
+
+def executar_worker(caminho, quantidade=TAMANHO_LOTE, duracao_aluguel=DURACAO_ALUGUEL):
+    """
+    Aluga lotes, simula e grava os resultados até a fila não ter mais tarefas
+    pendentes nem alugadas. Enquanto outros workers ainda têm aluguéis em
+    andamento, espera e tenta de novo, para assumir os que vencerem.
+    """
+    import simulacao
+    simulacao.abrir_armazem()
+    fila = FilaTarefas(caminho, duracao_aluguel)
+    dono = f'{socket.gethostname()}:{os.getpid()}'
+    concluidas = 0
+    while True:
+        aluguel, tarefas = fila.alugar(dono, quantidade)
+        if not tarefas:
+            contagem = fila.contagem()
+            if contagem['pendente'] == contagem['alugada'] == contagem['vencida'] == 0:
+                break
+            time.sleep(min(5.0, duracao_aluguel / 4))
+            continue
+
+        # Heartbeat em uma thread com conexão própria enquanto o lote é simulado
+        parar = threading.Event()
+        heartbeat = threading.Thread(target=_renovar_periodicamente, args=(caminho, aluguel, duracao_aluguel, parar), daemon=True)
+        heartbeat.start()
+        try:
+            for id_tarefa, tarefa in tarefas:
+                resultado = simulacao.executar_tarefa(*tarefa)
+                if fila.concluir(aluguel, id_tarefa, resultado) and resultado is not None:
+                    concluidas += 1
+        finally:
+            parar.set()
+            heartbeat.join()
+    print(f'Worker {dono}: {concluidas} tarefas concluídas')
+    return concluidas
+
+
+def _renovar_periodicamente(caminho, aluguel, duracao_aluguel, parar):
+    fila = FilaTarefas(caminho, duracao_aluguel)
+    while not parar.wait(duracao_aluguel / 3):
+        if fila.renovar(aluguel) == 0:
+            break
+
+
+# ==========================
+# PONTO DE ENTRADA PRINCIPAL
+# ==========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varredura distribuída por uma fila de tarefas em SQLite.")
+    parser.add_argument("comando", choices=["criar", "worker", "local", "status", "exportar"])
+    parser.add_argument("fila", help="Arquivo SQLite da fila (em diretório compartilhado).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Workers do comando 'local'.")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Tarefas por aluguel.")
+    parser.add_argument("--aluguel", type=float, default=DURACAO_ALUGUEL, help="Duração do aluguel em segundos.")
+    args = parser.parse_args()
+
+    if args.comando == "criar":
+        import simulacao
+        if simulacao.ARQUIVO_ARMAZEM is not None:
+            # Cada máquina precisa do armazém no próprio diretório (ou compartilhado)
+            simulacao.escrever_armazem(simulacao.seeds, simulacao.ARQUIVO_ARMAZEM, lote=simulacao.MUNDOS_EM_LOTE)
+        tarefas = simulacao.montar_tarefas()
+        criadas = FilaTarefas(args.fila).criar(tarefas)
+        print(f'{criadas} tarefas criadas em {args.fila} ({len(tarefas) - criadas} já estavam na fila)')
+    elif args.comando == "worker":
+        executar_worker(args.fila, args.lote, args.aluguel)
+    elif args.comando == "local":
+        processos = [
+            multiprocessing.Process(target=executar_worker, args=(args.fila, args.lote, args.aluguel))
+            for _ in range(args.workers)
+        ]
+        for processo in processos:
+            processo.start()
+        for processo in processos:
+            processo.join()
+        print(FilaTarefas(args.fila).contagem())
+    elif args.comando == "status":
+        print(FilaTarefas(args.fila).contagem())
+    else:
+        import simulacao
+        simulacao.gravar_resultados(FilaTarefas(args.fila).resultados())
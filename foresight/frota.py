@@ -0,0 +1,659 @@
+"""
+Simulação de uma frota de robôs no mesmo grid.
+
+N robôs compartilham World.packages, World.goals e o recharger. A cada tick:
+
+ - Robôs livres recebem tarefas (um pacote, ou uma meta se já carregam um)
+   por alocação gulosa sobre a matriz de distâncias robô x tarefa. Cada pacote
+   ou meta fica reservado para um único robô.
+ - Cada robô anda um passo ou espera. Os movimentos passam por uma tabela de
+   reservas espaço-tempo (célula, tick) que impede dois robôs na mesma célula
+   e trocas de posição pela mesma aresta.
+
+As distâncias vêm de campos de distância calculados uma única vez por ponto
+de interesse (pacotes, metas e recharger), todos juntos em um array
+(pontos, y, x) do NumPy. Assim as consultas de todos os robôs de um tick
+(custos da alocação e próximo passo de cada um) são feitas em lote, por
+indexação, e o número de buscas não cresce com o tamanho da frota. Só os
+robôs bloqueados há alguns ticks fazem uma busca própria: um A* espaço-tempo
+cooperativo em uma janela curta, que respeita as reservas dos outros robôs e
+reserva o caminho encontrado. Se as janelas de um robô falham seguidamente
+em aproximá-lo do alvo (p.ex. dois robôs de frente em um corredor), o impasse
+é resolvido por prioridade: entre ele e o robô que ocupa a próxima célula do
+seu caminho, o de menor prioridade recua para uma célula fora do caminho do
+outro e espera ali até o fim da janela.
+
+Os custos seguem o jogo de um robô: cada passo custa 1 (5 com bateria
+negativa), cada entrega vale 50 e passar pelo recharger recarrega a bateria
+para 60. Esperar não gasta bateria.
+"""
+import argparse
+import heapq
+import random
+import time
+
+import numpy as np
+
+from main import BasePlayer, World, custo_trecho
+
+INF = np.iinfo(np.int32).max // 2
+# Esperar e os quatro movimentos, na mesma ordem de vizinhos dos A* de main.py
+MOVIMENTOS = ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1))
+_DESLOCAMENTOS = np.array(MOVIMENTOS)
+
+
+def calcular_campos(mapa, alvos):
+    """
+    Campos de distância (em passos) de todas as células até cada alvo, todos
+    calculados ao mesmo tempo por uma busca em largura vetorizada. Retorna um
+    array (len(alvos), altura + 2, largura + 2) com uma borda de INF, de modo
+    que campos[k, y + 1, x + 1] é a distância de (x, y) ao alvo k (INF se
+    inalcançável ou obstáculo) e os vizinhos de qualquer célula podem ser
+    indexados sem checar limites.
+    """
+    livre = np.asarray(mapa) == 0
+    altura, largura = livre.shape
+    campos = np.full((len(alvos), altura + 2, largura + 2), INF, dtype=np.int32)
+    interior = campos[:, 1:-1, 1:-1]
+    fronteira = np.zeros((len(alvos), altura, largura), dtype=bool)
+    for k, (x, y) in enumerate(alvos):
+        if livre[y, x]:
+            fronteira[k, y, x] = True
+    interior[fronteira] = 0
+    nao_visitadas = livre & ~fronteira
+    distancia = 0
+    while fronteira.any():
+        distancia += 1
+        vizinhas = np.zeros_like(fronteira)
+        vizinhas[:, 1:, :] |= fronteira[:, :-1, :]
+        vizinhas[:, :-1, :] |= fronteira[:, 1:, :]
+        vizinhas[:, :, 1:] |= fronteira[:, :, :-1]
+        vizinhas[:, :, :-1] |= fronteira[:, :, 1:]
+        fronteira = vizinhas & nao_visitadas
+        interior[fronteira] = distancia
+        nao_visitadas &= ~fronteira
+    return campos
+
+
+def gerar_layout_frota(tamanho=100, num_robos=50, num_pacotes=None, num_metas=None, seed=None):
+    """
+    Gera um layout no formato de World(layout=...) para um grid tamanho x tamanho,
+    com o mesmo padrão de barragens e blocos de World.generate_obstacles em
+    densidade proporcional à área. Retorna (layout, posições dos robôs); a posição
+    do jogador no layout é a do primeiro robô.
+    """
+    rng = random.Random(seed)
+    num_metas = num_metas if num_metas is not None else num_robos
+    num_pacotes = num_pacotes if num_pacotes is not None else num_metas + 1
+    mapa = [[0] * tamanho for _ in range(tamanho)]
+    escala = max(1, round(tamanho * tamanho / 900))  # World: 30x30 com 7 + 7 barragens e 1 bloco
+
+    for horizontal in (True, False):
+        for _ in range(7 * escala):
+            fixo = rng.randint(5, tamanho - 6)
+            inicio = rng.randint(0, tamanho - 10)
+            for variavel in range(inicio, inicio + rng.randint(5, 10)):
+                if rng.random() < 0.7:
+                    if horizontal:
+                        mapa[fixo][variavel] = 1
+                    else:
+                        mapa[variavel][fixo] = 1
+    for _ in range(escala):
+        lado = rng.choice([4, 6])
+        topo = rng.randint(0, tamanho - lado)
+        esquerda = rng.randint(0, tamanho - lado)
+        for y in range(topo, topo + lado):
+            for x in range(esquerda, esquerda + lado):
+                mapa[y][x] = 1
+
+    # Recharger na célula livre mais próxima do centro; os demais pontos em
+    # células livres distintas da mesma região conexa, para que todos se alcancem
+    centro = tamanho // 2
+    livres = [(x, y) for y in range(tamanho) for x in range(tamanho) if mapa[y][x] == 0]
+    recharger = min(livres, key=lambda c: (abs(c[0] - centro) + abs(c[1] - centro), c))
+    campo = calcular_campos(mapa, [recharger])[0, 1:-1, 1:-1]
+    alcancaveis = [c for c in livres if campo[c[1], c[0]] < INF and c != recharger]
+    pontos = [list(c) for c in rng.sample(alcancaveis, num_pacotes + num_metas + num_robos)]
+    pacotes = pontos[:num_pacotes]
+    metas = pontos[num_pacotes:num_pacotes + num_metas]
+    robos = pontos[num_pacotes + num_metas:]
+    return (mapa, pacotes, metas, robos[0], list(recharger)), robos
+
+
+class TabelaReservas:
+    """
+    Reservas espaço-tempo: quem ocupa cada célula em cada tick e quem usa cada
+    aresta (origem -> destino) ao sair de cada tick, para impedir colisões em
+    células e trocas de posição entre dois robôs.
+    """
+    def __init__(self):
+        self.celulas = {}  # tick -> {(x, y): robô}
+        self.arestas = {}  # tick -> {((x, y), (x, y)): robô}
+
+    def ocupante(self, celula, t):
+        return self.celulas.get(t, {}).get(celula)
+
+    def livre(self, origem, destino, t, robo):
+        """Se 'robo' pode ir de 'origem' (tick t) para 'destino' (tick t + 1)."""
+        ocupante = self.ocupante(destino, t + 1)
+        if ocupante is not None and ocupante != robo:
+            return False
+        contrario = self.arestas.get(t, {}).get((destino, origem))
+        return contrario is None or contrario == robo
+
+    def reservar(self, robo, origem, destino, t):
+        self.celulas.setdefault(t + 1, {})[destino] = robo
+        if origem != destino:
+            self.arestas.setdefault(t, {})[(origem, destino)] = robo
+
+    def liberar(self, robo, caminho, t):
+        """Desfaz as reservas de 'caminho' (células dos ticks t, t + 1, ...)."""
+        for i in range(1, len(caminho)):
+            if self.celulas.get(t + i, {}).get(caminho[i]) == robo:
+                del self.celulas[t + i][caminho[i]]
+            if self.arestas.get(t + i - 1, {}).get((caminho[i - 1], caminho[i])) == robo:
+                del self.arestas[t + i - 1][(caminho[i - 1], caminho[i])]
+
+    def descartar_ate(self, t):
+        """Remove as reservas de ticks anteriores a t."""
+        for tabela in (self.celulas, self.arestas):
+            for tick in [tick for tick in tabela if tick < t]:
+                del tabela[tick]
+
+
+class RoboFrota(BasePlayer):
+    """Robô da frota: a tarefa e o próximo alvo são definidos pela Frota."""
+    def __init__(self, indice, position):
+        super().__init__(position)
+        self.indice = indice
+        self.tarefa = None   # Índice do ponto (pacote ou meta) reservado para o robô
+        self.alvo = None     # Índice do ponto para onde está indo (a tarefa ou o recharger)
+        self.plano = []      # Células reservadas pelo A* espaço-tempo, a partir do próximo tick
+        self.espera = 0      # Ticks seguidos parado com um alvo
+        self.falhas = 0      # Janelas do A* espaço-tempo sem progresso desde o último passo rumo ao alvo
+        self.recuando = False  # O plano atual é um recuo para resolver um impasse
+
+    def escolher_alvo(self, world):
+        return [world.frota.pontos[self.alvo]] if self.alvo is not None else []
+
+
+class Frota:
+    """
+    Executa N robôs em um World compartilhado. 'janela' é o horizonte (em
+    ticks) do A* espaço-tempo, 'paciencia' quantos ticks um robô espera
+    bloqueado antes de usá-lo e 'tentativas' quantas janelas seguidas sem
+    progresso caracterizam um impasse.
+    """
+    def __init__(self, world, posicoes, janela=8, paciencia=2, tentativas=2):
+        self.world = world
+        self.world.frota = self
+        self.janela = janela
+        self.paciencia = paciencia
+        self.tentativas = tentativas
+        self.robos = [RoboFrota(i, list(pos)) for i, pos in enumerate(posicoes)]
+        self.world.player = self.robos[0]
+        self.world.total_items = min(len(world.packages), len(world.goals))
+
+        # Pontos de interesse: pacotes, metas e recharger, com um campo de distâncias cada
+        self.pontos = [list(p) for p in world.packages] + [list(g) for g in world.goals] + [list(world.recharger)]
+        self.num_pacotes = len(world.packages)
+        self.indice_recharger = len(self.pontos) - 1
+        self.campos = calcular_campos(world.map, self.pontos)
+        self.pendentes = set(range(len(self.pontos) - 1))  # Pacotes e metas ainda no mundo
+        self.reservados = set()                            # Pontos já atribuídos a algum robô
+
+        self.reservas = TabelaReservas()
+        self.tick = 0
+        self.score = 0
+        self.steps = 0
+        self.recargas = 0
+        self.num_deliveries = 0
+        self.replanejamentos = 0
+        self.impasses = 0
+
+    # ==========================
+    # CONSULTAS EM LOTE
+    # ==========================
+    def _posicoes(self, robos):
+        return np.array([r.position for r in robos], dtype=np.int64).reshape(-1, 2)
+
+    def _distancias(self, indices_pontos, posicoes):
+        """Matriz (pontos, robôs) de distâncias, em uma única indexação dos campos."""
+        return self.campos[np.asarray(indices_pontos)[:, None], posicoes[:, 1] + 1, posicoes[:, 0] + 1]
+
+    def _preferencias(self, robos):
+        """
+        Para cada robô, os movimentos (índices de MOVIMENTOS) que o aproximam do
+        alvo, do melhor para o pior, calculados para todos os robôs de uma vez.
+        """
+        posicoes = self._posicoes(robos)
+        alvos = np.array([r.alvo for r in robos], dtype=np.int64)
+        destinos = posicoes[:, None, :] + _DESLOCAMENTOS
+        valores = self.campos[alvos[:, None], destinos[:, :, 1] + 1, destinos[:, :, 0] + 1]
+        ordem = np.argsort(valores, axis=1, kind='stable')
+        melhora = np.take_along_axis(valores, ordem, axis=1) < valores[:, :1]
+        return [ordem[i][melhora[i]].tolist() for i in range(len(robos))]
+
+    # ==========================
+    # ALOCAÇÃO DE TAREFAS
+    # ==========================
+    def _alocar(self):
+        livres = [r for r in self.robos if r.tarefa is None]
+        if not livres:
+            return
+        metas_livres = [p for p in self.pendentes - self.reservados if p >= self.num_pacotes]
+        pacotes_livres = [p for p in self.pendentes - self.reservados if p < self.num_pacotes]
+        # Só vale buscar um pacote se sobrar meta para entregá-lo
+        carregando = sum(r.cargo for r in self.robos)
+        indo_a_pacotes = sum(1 for r in self.robos if r.tarefa is not None and r.tarefa < self.num_pacotes)
+        vagas = len([p for p in self.pendentes if p >= self.num_pacotes]) - carregando - indo_a_pacotes
+
+        for com_carga, tarefas in ((True, metas_livres), (False, pacotes_livres)):
+            robos = [r for r in livres if (r.cargo > 0) == com_carga]
+            if not robos or not tarefas:
+                continue
+            limite = len(robos) if com_carga else max(vagas, 0)
+            distancias = self._distancias(tarefas, self._posicoes(robos))
+            # Gulosa global: pares (tarefa, robô) em ordem crescente de distância
+            atribuidas = set()
+            for k in np.argsort(distancias, axis=None, kind='stable'):
+                if len(atribuidas) >= limite:
+                    break
+                i, j = divmod(int(k), len(robos))
+                if distancias[i, j] >= INF:
+                    break
+                robo = robos[j]
+                if robo.tarefa is not None or tarefas[i] in self.reservados:
+                    continue
+                self._atribuir(robo, tarefas[i], int(distancias[i, j]))
+                atribuidas.add(tarefas[i])
+
+    def _atribuir(self, robo, tarefa, distancia):
+        robo.tarefa = tarefa
+        self.reservados.add(tarefa)
+        # Passa antes pelo recharger se isso custar menos que ir direto (custo_trecho)
+        x, y = self.pontos[tarefa]
+        rx, ry = robo.position
+        ate_recharger = int(self.campos[self.indice_recharger, ry + 1, rx + 1])
+        recharger_ate_tarefa = int(self.campos[self.indice_recharger, y + 1, x + 1])
+        direto, _ = custo_trecho(robo.battery, distancia)
+        if ate_recharger < INF and recharger_ate_tarefa < INF:
+            ida, _ = custo_trecho(robo.battery, ate_recharger)
+            volta, _ = custo_trecho(60, recharger_ate_tarefa)
+            if ida + volta > direto:
+                robo.alvo = self.indice_recharger
+                return
+        robo.alvo = tarefa
+
+    # ==========================
+    # MOVIMENTO
+    # ==========================
+    def passo(self):
+        """Executa um tick da frota. Retorna False quando não há mais o que fazer."""
+        if self.num_deliveries >= self.world.total_items:
+            return False
+        self._alocar()
+        # Robôs sem alvo só se movem sozinhos para cumprir um recuo planejado em um impasse
+        ativos = [r for r in self.robos if r.alvo is not None or r.plano]
+        if not ativos:
+            return False
+
+        t = self.tick
+        self.reservas.descartar_ate(t)
+        ocupadas = {tuple(r.position): r.indice for r in self.robos}
+
+        # Robôs com plano do A* têm prioridade; os demais seguem o campo do alvo
+        candidatos = {}
+        sem_plano = [r for r in ativos if not r.plano]
+        for robo, preferencias in zip(sem_plano, self._preferencias(sem_plano) if sem_plano else []):
+            x, y = robo.position
+            candidatos[robo.indice] = [(x + MOVIMENTOS[m][0], y + MOVIMENTOS[m][1]) for m in preferencias]
+        for robo in ativos:
+            if robo.plano:
+                candidatos[robo.indice] = [robo.plano[0]]
+
+        # Um robô só entra em uma célula ocupada depois que o ocupante a deixou:
+        # repete as passadas enquanto algum robô conseguir se mover
+        decididos = {}
+        pendentes = sorted(ativos, key=lambda r: (not r.plano, -r.cargo, r.indice))
+        progresso = True
+        while pendentes and progresso:
+            progresso = False
+            restantes = []
+            for robo in pendentes:
+                origem = tuple(robo.position)
+                escolhido = None
+                aguardando = False
+                for destino in candidatos[robo.indice]:
+                    ocupante = ocupadas.get(destino)
+                    if ocupante is not None and ocupante != robo.indice and ocupante not in decididos:
+                        # Robôs sem alvo saem da frente; os demais decidem antes
+                        ocupante_robo = self.robos[ocupante]
+                        if ocupante_robo.alvo is not None or ocupante_robo.plano or not self._ceder(ocupante_robo, origem, ocupadas, decididos, t):
+                            aguardando = True
+                            continue
+                    if self.reservas.livre(origem, destino, t, robo.indice):
+                        escolhido = destino
+                        break
+                if escolhido is None and aguardando:
+                    restantes.append(robo)
+                    continue
+                decididos[robo.indice] = escolhido
+                self._decidir(robo, origem, escolhido or origem, t)
+                progresso = True
+            pendentes = restantes
+        for robo in pendentes:
+            decididos[robo.indice] = None
+            self._decidir(robo, tuple(robo.position), tuple(robo.position), t)
+        # Robôs sem alvo que não precisaram sair da frente continuam parados
+        indices_ativos = {r.indice for r in ativos}
+        for robo in self.robos:
+            if robo.indice not in decididos:
+                self.reservas.reservar(robo.indice, tuple(robo.position), tuple(robo.position), t)
+            elif robo.indice not in indices_ativos:
+                self._mover(robo, list(decididos[robo.indice]))
+
+        bloqueados = []
+        for robo in ativos:
+            destino = decididos[robo.indice]
+            if destino is not None:
+                self._mover(robo, list(destino))
+            elif robo.plano:
+                # O plano ficou inválido (um robô não saiu do caminho): descarta e replaneja adiante
+                self._descartar_plano(robo, t)
+                robo.falhas += 1
+            else:
+                robo.espera += 1
+                if robo.espera >= self.paciencia and robo.alvo is not None:
+                    bloqueados.append(robo)
+        # Só depois de todos os movimentos: um impasse também muda o plano de outro robô
+        for robo in bloqueados:
+            if robo.plano:
+                continue  # Recebeu um recuo no impasse de outro robô
+            if robo.falhas >= self.tentativas:
+                self._resolver_impasse(robo, t + 1)
+            else:
+                self._planejar_ate_alvo(robo, t + 1)
+        self.tick += 1
+        return True
+
+    def _ceder(self, robo, vizinho, ocupadas, decididos, t):
+        """Move um robô sem alvo para uma célula vazia ao lado (exceto a de 'vizinho')."""
+        origem = tuple(robo.position)
+        for dx, dy in MOVIMENTOS[1:]:
+            destino = (origem[0] + dx, origem[1] + dy)
+            if destino == vizinho or destino in ocupadas:
+                continue
+            if self.campos[self.indice_recharger, destino[1] + 1, destino[0] + 1] >= INF:
+                continue  # Obstáculo ou fora do grid
+            if self.reservas.livre(origem, destino, t, robo.indice):
+                self.reservas.reservar(robo.indice, origem, destino, t)
+                decididos[robo.indice] = destino
+                return True
+        return False
+
+    def _decidir(self, robo, origem, destino, t):
+        if robo.plano and robo.plano[0] == destino:
+            return  # Já reservado pelo A* espaço-tempo
+        self.reservas.reservar(robo.indice, origem, destino, t)
+
+    def _mover(self, robo, destino):
+        if robo.plano:
+            robo.plano.pop(0)
+            robo.recuando = robo.recuando and bool(robo.plano)
+        robo.espera = 0
+        if destino == robo.position:
+            return  # Espera planejada pelo A* espaço-tempo: não gasta passo nem bateria
+        if robo.alvo is not None:
+            campo = self.campos[robo.alvo]
+            if campo[destino[1] + 1, destino[0] + 1] < campo[robo.position[1] + 1, robo.position[0] + 1]:
+                robo.falhas = 0
+        robo.position = destino
+        self.steps += 1
+        robo.battery -= 1
+        self.score += -1 if robo.battery >= 0 else -5
+        if destino == self.world.recharger:
+            robo.battery = 60
+            self.recargas += 1
+            if robo.alvo == self.indice_recharger:
+                robo.alvo = robo.tarefa
+                self._descartar_plano(robo, self.tick + 1)
+        if robo.alvo is not None and destino == self.pontos[robo.alvo]:
+            self._concluir(robo)
+
+    def _concluir(self, robo):
+        tarefa = robo.tarefa
+        if tarefa < self.num_pacotes:
+            robo.cargo += 1
+            self.world.packages.remove(self.pontos[tarefa])
+        else:
+            robo.cargo -= 1
+            self.num_deliveries += 1
+            self.world.goals.remove(self.pontos[tarefa])
+            self.score += 50
+        self.pendentes.discard(tarefa)
+        self.reservados.discard(tarefa)
+        robo.tarefa = None
+        robo.alvo = None
+        robo.falhas = 0
+        self._descartar_plano(robo, self.tick + 1)
+
+    def _descartar_plano(self, robo, t):
+        # 't' é o tick em que o robô está em robo.position
+        if robo.plano:
+            self.reservas.liberar(robo.indice, [tuple(robo.position)] + robo.plano, t)
+            robo.plano = []
+        robo.recuando = False
+
+    def _planejar_cooperativo(self, robo, t0, campo=None, ocupar=False):
+        """
+        A* espaço-tempo de um robô bloqueado, a partir do tick t0 e por no máximo
+        'janela' ticks, com o campo do alvo (ou 'campo', no formato de
+        calcular_campos) como heurística. Evita as reservas dos outros robôs e
+        considera parados os que não têm plano. O caminho encontrado é reservado
+        e seguido nos próximos ticks; com 'ocupar', o robô fica na última célula
+        até o fim da janela. Retorna se o caminho aproxima o robô do destino.
+        """
+        self.replanejamentos += 1
+        if campo is None:
+            campo = self.campos[robo.alvo]
+        inicio = tuple(robo.position)
+        parados = {tuple(r.position) for r in self.robos if r is not robo and not r.plano}
+        fila = [(int(campo[inicio[1] + 1, inicio[0] + 1]), 0, inicio, t0)]
+        anterior = {(inicio, t0): None}
+        melhor = None
+        while fila:
+            f, g, celula, t = heapq.heappop(fila)
+            h = f - g
+            if h == 0 or t - t0 >= self.janela:
+                melhor = (celula, t)
+                break
+            for dx, dy in MOVIMENTOS:
+                vizinha = (celula[0] + dx, celula[1] + dy)
+                distancia = int(campo[vizinha[1] + 1, vizinha[0] + 1])
+                if distancia >= INF or (vizinha, t + 1) in anterior:
+                    continue
+                if vizinha != inicio and vizinha in parados:
+                    continue
+                if not self.reservas.livre(celula, vizinha, t, robo.indice):
+                    continue
+                anterior[(vizinha, t + 1)] = (celula, t)
+                heapq.heappush(fila, (g + 1 + distancia, g + 1, vizinha, t + 1))
+        if melhor is None or melhor[1] == t0:
+            return False
+
+        caminho = []
+        no = melhor
+        while no is not None:
+            caminho.append(no)
+            no = anterior[no]
+        caminho.reverse()
+        if ocupar:
+            celula, t = caminho[-1]
+            for t in range(t + 1, t0 + self.janela + 1):
+                if not self.reservas.livre(celula, celula, t - 1, robo.indice):
+                    break
+                caminho.append((celula, t))
+        for (origem, t), (destino, _) in zip(caminho, caminho[1:]):
+            self.reservas.reservar(robo.indice, origem, destino, t)
+        robo.plano = [celula for celula, _ in caminho[1:]]
+        robo.espera = 0
+        celula = melhor[0]
+        return campo[celula[1] + 1, celula[0] + 1] < campo[inicio[1] + 1, inicio[0] + 1]
+
+    def _planejar_ate_alvo(self, robo, t0):
+        """A* espaço-tempo até o alvo, contando as janelas que não aproximam o robô dele."""
+        if not self._planejar_cooperativo(robo, t0):
+            robo.falhas += 1
+
+    def _resolver_impasse(self, robo, t0):
+        """
+        Impasse de 'robo' com o robô que ocupa a próxima célula do seu caminho: o
+        de menor prioridade (sem alvo, depois sem carga, depois maior índice) recua
+        para a célula livre mais próxima fora dos caminhos mínimos do outro e
+        espera ali até o fim da janela; o outro descarta o plano e segue o campo do
+        alvo. Se a única saída de quem recua passa pelo outro (p.ex. um beco), o
+        outro antes dá um passo para o lado, fora do caminho do recuo.
+        """
+        self.impasses += 1
+        x, y = robo.position
+        ocupadas = {tuple(r.position): r for r in self.robos}
+        bloqueador = None
+        for m in self._preferencias([robo])[0]:
+            bloqueador = ocupadas.get((x + MOVIMENTOS[m][0], y + MOVIMENTOS[m][1]))
+            if bloqueador is not None:
+                break
+        if bloqueador is None:
+            self._planejar_ate_alvo(robo, t0)
+            return
+        prioridade = lambda r: (r.alvo is None, -r.cargo, r.indice)
+        recua, segue = sorted((robo, bloqueador), key=prioridade, reverse=True)
+        if recua.recuando:
+            return  # Já está saindo da frente de outro robô: não desfaz aquele recuo
+        for r in (recua, segue):
+            if not r.recuando:
+                self._descartar_plano(r, t0)
+            r.falhas = 0
+            r.espera = 0
+
+        fora = self._fora_dos_caminhos(segue.position, self.campos[segue.alvo, 1:-1, 1:-1])
+        escolha = self._celula_livre(recua, fora)
+        passar_por_segue = escolha is None
+        if passar_por_segue:
+            if segue.recuando:
+                return
+            escolha = self._celula_livre(recua, fora, atravessar=segue)
+            if escolha is None:
+                return
+        celula, _ = escolha
+        campo = calcular_campos(self.world.map, [celula])[0]
+        if passar_por_segue:
+            lado = self._celula_livre(segue, self._fora_dos_caminhos(recua.position, campo[1:-1, 1:-1]))
+            if lado is None:
+                return
+            self._planejar_cooperativo(segue, t0, calcular_campos(self.world.map, [lado[0]])[0])
+            segue.recuando = bool(segue.plano)
+        self._planejar_cooperativo(recua, t0, campo, ocupar=True)
+        recua.recuando = bool(recua.plano)
+
+    def _fora_dos_caminhos(self, origem, ate_destino):
+        """
+        Máscara (y, x) das células fora de todos os caminhos mínimos de 'origem'
+        ao destino cujo campo (sem borda) é 'ate_destino': d(origem, c) + d(c, destino) > d(origem, destino).
+        """
+        x, y = origem
+        de_origem = calcular_campos(self.world.map, [(x, y)])[0, 1:-1, 1:-1].astype(np.int64)
+        ate_destino = ate_destino.astype(np.int64)
+        return de_origem + ate_destino > de_origem[y, x] + ate_destino[y, x]
+
+    def _celula_livre(self, robo, mascara, atravessar=None):
+        """
+        Célula desocupada mais próxima de 'robo' entre as da máscara, alcançável
+        sem passar pelas células ocupadas agora (exceto a de 'atravessar').
+        Retorna ((x, y), distância) ou None.
+        """
+        mapa = np.array(self.world.map)
+        for r in self.robos:
+            if r is not robo and r is not atravessar:
+                mapa[r.position[1], r.position[0]] = 1
+        distancias = calcular_campos(mapa, [tuple(robo.position)])[0, 1:-1, 1:-1]
+        candidatas = mascara & (distancias < INF)
+        for r in self.robos:
+            candidatas[r.position[1], r.position[0]] = False
+        if not candidatas.any():
+            return None
+        custo = np.where(candidatas, distancias, INF)
+        y, x = np.unravel_index(int(np.argmin(custo)), custo.shape)
+        return (int(x), int(y)), int(custo[y, x])
+
+    def executar(self, max_ticks=10000):
+        while self.tick < max_ticks and self.passo():
+            pass
+        return self.tick
+
+
+# Layouts (tamanho, robôs, seed) que já travaram a frota: impasses em corredores,
+# becos ocupados por robôs parados e a entrada do recharger congestionada
+CASOS_VERIFICACAO = [(60, 80, 14), (60, 80, 20), (60, 80, 79), (60, 80, 104), (30, 30, 5), (100, 300, 1)]
+
+
+def verificar(tamanho, num_robos, seed, max_ticks=5000):
+    """
+    Roda um layout de gerar_layout_frota conferindo a cada tick que não há dois
+    robôs na mesma célula, troca de posição entre dois robôs nem passo inválido,
+    e que só os movimentos contam como passos. Levanta AssertionError se algum
+    falhar ou se a frota não concluir todas as entregas em max_ticks.
+    """
+    layout, posicoes = gerar_layout_frota(tamanho, num_robos, seed=seed)
+    frota = Frota(World(visual=False, layout=layout), posicoes)
+    mapa = layout[0]
+    movimentos = 0
+    while frota.tick < max_ticks:
+        antes = [tuple(r.position) for r in frota.robos]
+        if not frota.passo():
+            break
+        depois = [tuple(r.position) for r in frota.robos]
+        assert len(set(depois)) == len(depois), f"Colisão no tick {frota.tick}"
+        indice_antes = {pos: i for i, pos in enumerate(antes)}
+        for i, (a, d) in enumerate(zip(antes, depois)):
+            assert abs(a[0] - d[0]) + abs(a[1] - d[1]) <= 1 and mapa[d[1]][d[0]] == 0, f"Passo inválido no tick {frota.tick}"
+            j = indice_antes.get(d)
+            assert j is None or j == i or depois[j] != a, f"Troca de posição no tick {frota.tick}"
+            movimentos += a != d
+    assert movimentos == frota.steps, f"{frota.steps} passos contados para {movimentos} movimentos"
+    assert frota.num_deliveries == frota.world.total_items, \
+        f"{frota.num_deliveries}/{frota.world.total_items} entregas em {frota.tick} ticks"
+    return frota
+
+
+# ==========================
+# PONTO DE ENTRADA PRINCIPAL
+# ==========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simula uma frota de robôs no mesmo grid.")
+    parser.add_argument("--robos", type=int, default=50, help="Número de robôs.")
+    parser.add_argument("--tamanho", type=int, default=100, help="Lado do grid.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed do layout (opcional).")
+    parser.add_argument("--max-ticks", type=int, default=10000, help="Limite de ticks.")
+    parser.add_argument("--verificar", action="store_true", help="Roda os layouts de CASOS_VERIFICACAO conferindo colisões e entregas.")
+    args = parser.parse_args()
+
+    if args.verificar:
+        for tamanho, robos, seed in CASOS_VERIFICACAO:
+            frota = verificar(tamanho, robos, seed)
+            print(f"Grid: {tamanho}x{tamanho}, Robôs: {robos}, Seed: {seed}: {frota.tick} ticks, "
+                  f"Pontuação: {frota.score}, Impasses: {frota.impasses}")
+        raise SystemExit
+
+    layout, posicoes = gerar_layout_frota(args.tamanho, args.robos, seed=args.seed)
+    inicio = time.perf_counter()
+    frota = Frota(World(visual=False, layout=layout), posicoes)
+    preparo = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    ticks = frota.executar(args.max_ticks)
+    duracao = time.perf_counter() - inicio
+    print(f"Robôs: {args.robos}, Grid: {args.tamanho}x{args.tamanho}, Ticks: {ticks}, "
+          f"Entregas: {frota.num_deliveries}/{frota.world.total_items}, Passos: {frota.steps}, "
+          f"Pontuação: {frota.score}, Recargas: {frota.recargas}, Replanejamentos: {frota.replanejamentos}, "
+          f"Impasses: {frota.impasses}")
+    print(f"Campos: {preparo:.2f}s, Simulação: {duracao:.2f}s ({1000 * duracao / max(ticks, 1):.2f} ms/tick)")
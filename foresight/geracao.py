@@ -0,0 +1,172 @@
+"""
+Geração vetorizada de mundos em lote.
+
+Produz N layouts de uma vez como um array estruturado do NumPy (um registro por
+seed) e, opcionalmente, grava o resultado em um arquivo .npy que pode ser lido
+de volta mapeado em memória (np.load(..., mmap_mode='r')), sem cópia.
+
+Cada seed usa o próprio gerador baseado em contador (Philox com key=seed), de
+modo que o layout de uma seed não depende de quais outras seeds estão no lote.
+
+ATENÇÃO: os layouts gerados aqui NÃO são os mesmos de World(seed). World(seed)
+continua usando o gerador random.Random(seed) e é o que gerou os CSVs de
+resultados do repositório. Para simular um layout em lote use World(layout=...) ou
+Maze(layout=...), com o layout retornado por layout_da_seed.
+"""
+import os
+import numpy as np
+
+TAMANHO = 30          # Mesmo maze_size de World
+NUM_PACOTES = 5       # total_items + 1
+NUM_METAS = 4         # total_items
+NUM_SEGMENTOS = 7     # Barragens horizontais e verticais
+MAX_SEGMENTO = 10     # Comprimento máximo de uma barragem
+
+# Ordem das linhas em 'pontos': pacotes, metas, jogador e recharger
+PACOTES = slice(0, NUM_PACOTES)
+METAS = slice(NUM_PACOTES, NUM_PACOTES + NUM_METAS)
+JOGADOR = NUM_PACOTES + NUM_METAS
+RECHARGER = JOGADOR + 1
+NUM_PONTOS = RECHARGER + 1
+
+DTYPE_MUNDO = np.dtype([
+    ('seed', np.int64),
+    ('mapa', np.uint8, (TAMANHO, TAMANHO)),   # 0 = livre, 1 = obstáculo (mapa[y][x])
+    ('pontos', np.int16, (NUM_PONTOS, 2)),    # Coordenadas [x, y]
+])
+
+# Quantidade fixa de números aleatórios consumidos por seed
+_POR_SEGMENTO = 3 + MAX_SEGMENTO               # linha/coluna, início, comprimento e máscara
+_NUM_ALEATORIOS = 2 * NUM_SEGMENTOS * _POR_SEGMENTO + 3 + TAMANHO * TAMANHO + 9
+
+
+def _aleatorios(seeds):
+    """Matriz (N, _NUM_ALEATORIOS) de uniformes em [0, 1), uma linha por seed."""
+    u = np.empty((len(seeds), _NUM_ALEATORIOS))
+    for i, seed in enumerate(seeds):
+        u[i] = np.random.Generator(np.random.Philox(key=int(seed))).random(_NUM_ALEATORIOS)
+    return u
+
+
+def _inteiros(u, minimo, maximo):
+    """Converte uniformes em inteiros no intervalo fechado [minimo, maximo]."""
+    return (minimo + np.floor(u * (maximo - minimo + 1))).astype(np.int64)
+
+
+def _barragens(mapa, u, horizontal):
+    """Mesmo padrão de World.generate_obstacles, para todas as seeds de uma vez."""
+    n = mapa.shape[0]
+    u = u.reshape(n, NUM_SEGMENTOS, _POR_SEGMENTO)
+    fixo = _inteiros(u[:, :, 0], 5, TAMANHO - 6)
+    inicio = _inteiros(u[:, :, 1], 0, TAMANHO - 10)
+    comprimento = _inteiros(u[:, :, 2], 5, MAX_SEGMENTO)
+    offsets = np.arange(MAX_SEGMENTO)
+    variavel = inicio[:, :, None] + offsets
+    ocupa = (offsets < comprimento[:, :, None]) & (u[:, :, 3:] < 0.7)
+    mundo = np.broadcast_to(np.arange(n)[:, None, None], ocupa.shape)
+    fixo = np.broadcast_to(fixo[:, :, None], ocupa.shape)
+    if horizontal:
+        mapa[mundo[ocupa], fixo[ocupa], variavel[ocupa]] = 1
+    else:
+        mapa[mundo[ocupa], variavel[ocupa], fixo[ocupa]] = 1
+
+
+def _bloco(mapa, u):
+    """Obstáculo em bloco 4x4 ou 6x6 em posição aleatória."""
+    lado = np.where(u[:, 0] < 0.5, 4, 6)
+    topo = (np.floor(u[:, 1] * (TAMANHO - lado + 1))).astype(np.int64)
+    esquerda = (np.floor(u[:, 2] * (TAMANHO - lado + 1))).astype(np.int64)
+    eixo = np.arange(TAMANHO)
+    linhas = (eixo >= topo[:, None]) & (eixo < (topo + lado)[:, None])
+    colunas = (eixo >= esquerda[:, None]) & (eixo < (esquerda + lado)[:, None])
+    mapa[linhas[:, :, None] & colunas[:, None, :]] = 1
+
+
+def gerar_lote(seeds):
+    """
+    Gera os mundos das seeds fornecidas e retorna um array estruturado com
+    dtype DTYPE_MUNDO (campos 'seed', 'mapa' e 'pontos').
+    """
+    seeds = np.asarray(seeds, dtype=np.int64)
+    n = len(seeds)
+    u = _aleatorios(seeds)
+    por_direcao = NUM_SEGMENTOS * _POR_SEGMENTO
+    u_horizontal = u[:, :por_direcao]
+    u_vertical = u[:, por_direcao:2 * por_direcao]
+    u_bloco = u[:, 2 * por_direcao:2 * por_direcao + 3]
+    u_celulas = u[:, 2 * por_direcao + 3:2 * por_direcao + 3 + TAMANHO * TAMANHO]
+    u_centro = u[:, -9:]
+
+    mundos = np.zeros(n, dtype=DTYPE_MUNDO)
+    mundos['seed'] = seeds
+    mapa = mundos['mapa']
+    _barragens(mapa, u_horizontal, horizontal=True)
+    _barragens(mapa, u_vertical, horizontal=False)
+    _bloco(mapa, u_bloco)
+
+    # Pacotes, metas e jogador: as primeiras células livres de uma permutação
+    # aleatória do grid, o que garante posições distintas sem rejeição.
+    livres = mapa.reshape(n, -1) == 0
+    chaves = np.where(livres, u_celulas, 2.0)
+    ordem = np.argsort(chaves, axis=1)[:, :RECHARGER + 1]
+    pontos = mundos['pontos']
+    pontos[:, :RECHARGER, 0] = ordem[:, :RECHARGER] % TAMANHO
+    pontos[:, :RECHARGER, 1] = ordem[:, :RECHARGER] // TAMANHO
+
+    # Recharger: célula livre e desocupada da região 3x3 central; se não houver,
+    # usa a próxima célula livre da permutação (como o fallback de World).
+    centro = TAMANHO // 2
+    cx, cy = np.meshgrid(np.arange(centro - 1, centro + 2), np.arange(centro - 1, centro + 2))
+    indices_centro = (cy * TAMANHO + cx).ravel()
+    validos = livres[:, indices_centro] & ~(ordem[:, :RECHARGER, None] == indices_centro).any(axis=1)
+    escolha = np.argmin(np.where(validos, u_centro, 2.0), axis=1)
+    celula = np.where(validos.any(axis=1), indices_centro[escolha], ordem[:, RECHARGER])
+    pontos[:, RECHARGER, 0] = celula % TAMANHO
+    pontos[:, RECHARGER, 1] = celula // TAMANHO
+    return mundos
+
+
+def gerar_mundos(seeds, caminho=None):
+    """
+    Retorna os mundos das seeds. Com 'caminho', reaproveita o arquivo .npy se ele
+    já contiver exatamente essas seeds (abrindo-o mapeado em memória, somente
+    leitura); caso contrário gera o lote e o grava no arquivo antes de reabri-lo.
+    """
+    seeds = np.asarray(seeds, dtype=np.int64)
+    if caminho is None:
+        return gerar_lote(seeds)
+
+    if os.path.exists(caminho):
+        mundos = np.load(caminho, mmap_mode='r')
+        if mundos.dtype == DTYPE_MUNDO and np.array_equal(mundos['seed'], seeds):
+            return mundos
+        del mundos
+
+    destino = np.lib.format.open_memmap(caminho, mode='w+', dtype=DTYPE_MUNDO, shape=(len(seeds),))
+    destino[:] = gerar_lote(seeds)
+    destino.flush()
+    del destino
+    return np.load(caminho, mmap_mode='r')
+
+
+def layout_da_seed(mundos, seed):
+    """
+    Extrai o layout de uma seed no formato aceito por World(layout=...):
+    (mapa, pacotes, metas, jogador, recharger), com listas Python [x, y].
+    """
+    indice = np.flatnonzero(mundos['seed'] == seed)
+    if len(indice) == 0:
+        raise KeyError(f"Seed {seed} não está no lote")
+    return layout_do_registro(mundos[indice[0]])
+
+
+def layout_do_registro(registro):
+    """Layout de um registro do lote (p.ex. mundos[i]), sem procurar a seed."""
+    pontos = registro['pontos'].tolist()
+    return (
+        registro['mapa'].tolist(),
+        pontos[PACOTES],
+        pontos[METAS],
+        pontos[JOGADOR],
+        pontos[RECHARGER],
+    )
@@ -1,10 +1,151 @@
-import pygame
 import random
 import heapq
+import math
+import time
 import sys
+import threading
+from collections import deque
+from functools import lru_cache
 import argparse
 from abc import ABC, abstractmethod
 
+# ==========================
+# CUSTO DE TRECHOS E TABELA DE DISTÂNCIAS
+# ==========================
+def custo_trecho(bateria, comprimento, indice_recarga=-1):
+    """
+    Pontuação e bateria final após andar 'comprimento' passos com a bateria
+    inicial 'bateria', em forma fechada: -1 por passo com bateria >= 0 e -5 por
+    passo com bateria negativa. 'indice_recarga' é a posição do recharger no
+    caminho (-1 se o caminho não passa por ele), onde a bateria volta a 60.
+    """
+    if indice_recarga >= 0:
+        score_ate_recarga, _ = custo_trecho(bateria, indice_recarga + 1)
+        score_resto, bateria_final = custo_trecho(60, comprimento - indice_recarga - 1)
+        return score_ate_recarga + score_resto, bateria_final
+    passos_com_carga = min(max(bateria, 0), comprimento)
+    score = -passos_com_carga - 5 * (comprimento - passos_com_carga)
+    return score, bateria - comprimento
+
+class TabelaDistancias:
+    """
+    Trechos entre todos os pares de pontos de interesse (pacotes, metas, posição
+    inicial do jogador e recharger) de um mundo estático: comprimento do caminho
+    do A* de MazeSimulado e índice do recharger nesse caminho. Com ela o
+    planejador avalia um trecho em O(1), com o mesmo resultado do A*.
+    """
+    def __init__(self, pontos, comprimentos, indices_recarga):
+        self.pontos = [list(p) for p in pontos]
+        self.indices = {tuple(p): i for i, p in enumerate(self.pontos)}
+        self.comprimentos = comprimentos        # comprimentos[i][j]; -1 se inalcançável
+        self.indices_recarga = indices_recarga  # -1 se o caminho não passa pelo recharger
+
+    @classmethod
+    def calcular(cls, world):
+        pontos = list(world.packages) + list(world.goals) + [world.player.position, world.recharger]
+        maze = MazeSimulado(world)
+        recharger = list(world.recharger)
+        comprimentos = []
+        indices_recarga = []
+        for origem in pontos:
+            linha_comprimentos = []
+            linha_indices = []
+            for destino in pontos:
+                caminho = maze.astar(list(origem), list(destino))
+                linha_comprimentos.append(len(caminho) if caminho else -1)
+                linha_indices.append(caminho.index(recharger) if recharger in caminho else -1)
+            comprimentos.append(linha_comprimentos)
+            indices_recarga.append(linha_indices)
+        return cls(pontos, comprimentos, indices_recarga)
+
+    def cobre(self, origem, destino):
+        return tuple(origem) in self.indices and tuple(destino) in self.indices
+
+    def trecho(self, origem, destino):
+        """(comprimento, índice do recharger) do trecho, ou None se inalcançável."""
+        i = self.indices[tuple(origem)]
+        j = self.indices[tuple(destino)]
+        comprimento = self.comprimentos[i][j]
+        if comprimento <= 0:
+            # Mesmo comportamento do A*: origem == destino não gera caminho
+            return None
+        return comprimento, self.indices_recarga[i][j]
+
+def componentes_conexas(mapa):
+    """Rótulo da região livre de cada célula (-1 em obstáculos), por busca em largura."""
+    size = len(mapa)
+    rotulos = [[-1] * size for _ in range(size)]
+    rotulo = 0
+    for y0 in range(size):
+        for x0 in range(size):
+            if mapa[y0][x0] != 0 or rotulos[y0][x0] != -1:
+                continue
+            rotulos[y0][x0] = rotulo
+            fila = deque([(x0, y0)])
+            while fila:
+                x, y = fila.popleft()
+                for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < size and 0 <= ny < size and mapa[ny][nx] == 0 and rotulos[ny][nx] == -1:
+                        rotulos[ny][nx] = rotulo
+                        fila.append((nx, ny))
+            rotulo += 1
+    return rotulos
+
+class PodaSequencias:
+    """
+    Regras que descartam expansões de ForesightPlayer._gerar_sequencias antes
+    de materializá-las. Só entram regras cujas expansões descartadas levariam
+    sempre a sequências com pontuação -inf em _simular_sequencia, de modo que a
+    ação escolhida não muda:
+     - alvo_na_posicao_atual: ir ao ponto onde o jogador já está (p.ex. duas
+       visitas seguidas ao recharger, ou recarregar estando sobre o recharger);
+     - alvo_inalcancavel: alvo fora da região livre da posição atual.
+    contadores[regra][nivel] conta as expansões descartadas em cada nível da
+    árvore (1 = primeira ação); nos[nivel] conta as expansões mantidas.
+    """
+    REGRAS = ('alvo_na_posicao_atual', 'alvo_inalcancavel')
+
+    def __init__(self, componentes, posicao, profundidade):
+        self.posicao = list(posicao)
+        self.profundidade = profundidade
+        self.componentes = componentes  # De componentes_conexas(world.map)
+        self.contadores = {regra: {} for regra in self.REGRAS}
+        self.nos = {}
+
+    def regra_violada(self, sequencia_atual, alvo):
+        """Nome da regra que descarta a expansão sequencia_atual + [alvo], ou None."""
+        origem = sequencia_atual[-1] if sequencia_atual else self.posicao
+        if alvo == origem:
+            return 'alvo_na_posicao_atual'
+        if self.componentes[origem[1]][origem[0]] != self.componentes[alvo[1]][alvo[0]]:
+            return 'alvo_inalcancavel'
+        return None
+
+    def registrar(self, nivel, regra=None):
+        contagem = self.nos if regra is None else self.contadores[regra]
+        contagem[nivel] = contagem.get(nivel, 0) + 1
+
+@lru_cache(maxsize=None)
+def contar_expansoes(profundidade, pacotes, metas, metas_fora, carga, recharger, no_recharger, podar=True):
+    """
+    Expansões de ForesightPlayer._gerar_sequencias (com poda, só as mantidas)
+    para uma árvore de 'profundidade' níveis. Os alvos de cada nó dependem apenas
+    das quantidades de pacotes e metas alcançáveis, da carga e de o jogador estar
+    sobre o recharger; 'metas_fora' são as metas fora da região do jogador, que
+    não são alvos mas impedem o fim da árvore.
+    """
+    if profundidade == 0 or metas + metas_fora == 0:
+        return 0
+    total = 0
+    if carga < 4 and pacotes:
+        total += pacotes * (1 + contar_expansoes(profundidade - 1, pacotes - 1, metas, metas_fora, carga + 1, recharger, False, podar))
+    if carga > 0 and metas:
+        total += metas * (1 + contar_expansoes(profundidade - 1, pacotes, metas - 1, metas_fora, carga - 1, recharger, False, podar))
+    if recharger and not (podar and no_recharger):
+        total += 1 + contar_expansoes(profundidade - 1, pacotes, metas, metas_fora, carga, recharger, True, podar)
+    return total
+
 # ==========================
 # CLASSES DE PLAYER
 # ==========================
@@ -66,13 +207,29 @@ class ForesightPlayer(BasePlayer):
         super().__init__(position)
         self.M = foresight_depth
         self.recalcular_por_movimento= recalcular_por_movimento  # Profundidade da simulação
+        self.tabela = None  # TabelaDistancias opcional (p.ex. do armazem.py) para evitar o A*
+        self.podar = True  # Descarta expansões inviáveis (PodaSequencias) ao gerar as sequências
+        # Expansões descartadas por regra e nível, acumuladas ao longo do episódio
+        self.contadores_poda = {regra: {} for regra in PodaSequencias.REGRAS}
+        self.nos_gerados = {}
+        self._componentes = None  # (versão do mapa, rótulos) da última chamada a componentes_conexas
+        # Com orçamento, cada decisão usa a maior profundidade (até M) cuja árvore
+        # prevista por contar_nos tem no máximo esse número de expansões
+        self.orcamento_nos = None
+        self.decisoes = []  # (profundidade, nós previstos, nós gerados) de cada decisão
 
     def escolher_alvo(self, world):
         melhor_sequencia = []
         melhor_score = -float('inf')
         
-        # Gera todas as sequências possíveis de ações até a profundidade M
-        sequencias = self._gerar_sequencias(world, self.M)
+        # Gera todas as sequências possíveis de ações até a profundidade escolhida
+        profundidade = self._escolher_profundidade(world)
+        previstos = self.contar_nos(world, profundidade)
+        poda = PodaSequencias(self._componentes_do_mapa(world), self.position, profundidade) if self.podar else None
+        sequencias = self._gerar_sequencias(world, profundidade, poda=poda)
+        if poda is not None:
+            self._acumular_contadores(poda)
+        self.decisoes.append((profundidade, previstos, sum(poda.nos.values()) if poda is not None else None))
         
         # Avalia cada sequência e escolhe a melhor
         for seq in sequencias:
@@ -86,9 +243,51 @@ class ForesightPlayer(BasePlayer):
             return aux_sequencia if aux_sequencia else None
 
 
-        return melhor_sequencia[:self.M]  # Retorna até M ações
+        return melhor_sequencia[:profundidade]  # Retorna até M ações
+
+    def contar_nos(self, world, profundidade):
+        """
+        Número de expansões que _gerar_sequencias fará a partir do estado atual com
+        esta profundidade, sem gerar a árvore (com poda, igual a soma de PodaSequencias.nos).
+        """
+        if self.podar:
+            # Todos os nós da árvore ficam na região do jogador: os demais alvos são podados
+            componentes = self._componentes_do_mapa(world)
+            regiao = componentes[self.position[1]][self.position[0]]
+            alcancavel = lambda ponto: componentes[ponto[1]][ponto[0]] == regiao
+        else:
+            alcancavel = lambda ponto: True
+        pacotes = sum(1 for pkg in world.packages if alcancavel(pkg))
+        metas = sum(1 for goal in world.goals if alcancavel(goal))
+        recharger = bool(world.recharger) and alcancavel(world.recharger)
+        no_recharger = list(self.position) == list(world.recharger or [])
+        return contar_expansoes(profundidade, pacotes, metas, len(world.goals) - metas, self.cargo,
+                                recharger, no_recharger, self.podar)
+
+    def _escolher_profundidade(self, world):
+        """M sem orçamento; com ele, a maior profundidade até M que cabe no orçamento (no mínimo 1)."""
+        if not self.orcamento_nos:
+            return self.M
+        profundidade = 1
+        while profundidade < self.M and self.contar_nos(world, profundidade + 1) <= self.orcamento_nos:
+            profundidade += 1
+        return profundidade
+
+    def _componentes_do_mapa(self, world):
+        # Recalcula as regiões livres só quando o mapa muda
+        versao = (id(world.map), getattr(world, 'versao_mapa', 0))
+        if self._componentes is None or self._componentes[0] != versao:
+            self._componentes = (versao, componentes_conexas(world.map))
+        return self._componentes[1]
+
+    def _acumular_contadores(self, poda):
+        for regra, por_nivel in poda.contadores.items():
+            for nivel, quantidade in por_nivel.items():
+                self.contadores_poda[regra][nivel] = self.contadores_poda[regra].get(nivel, 0) + quantidade
+        for nivel, quantidade in poda.nos.items():
+            self.nos_gerados[nivel] = self.nos_gerados.get(nivel, 0) + quantidade
 
-    def _gerar_sequencias(self, world, profundidade, sequencia_atual=[]):
+    def _gerar_sequencias(self, world, profundidade, sequencia_atual=[], poda=None):
         remaining_goals = len(world.goals)
         if profundidade == 0 or remaining_goals == 0:
             return [sequencia_atual.copy()]
@@ -109,6 +308,12 @@ class ForesightPlayer(BasePlayer):
         
         sequencias = []
         for alvo in opcoes:
+            if poda is not None:
+                nivel = poda.profundidade - profundidade + 1
+                regra = poda.regra_violada(sequencia_atual, alvo)
+                poda.registrar(nivel, regra)
+                if regra is not None:
+                    continue
             novo_mundo = self._clonar_estado(estado_atual)  # Usa o estado clonado
             nova_sequencia = sequencia_atual.copy()
             nova_sequencia.append(alvo)
@@ -124,7 +329,7 @@ class ForesightPlayer(BasePlayer):
             sub_player = ForesightPlayer(novo_mundo.player.position, profundidade - 1)
             sub_player.cargo = novo_mundo.player.cargo
             sub_player.battery = novo_mundo.player.battery
-            sub_seq = sub_player._gerar_sequencias(novo_mundo, profundidade - 1, nova_sequencia)
+            sub_seq = sub_player._gerar_sequencias(novo_mundo, profundidade - 1, nova_sequencia, poda)
             sequencias.extend(sub_seq)
         
         return sequencias
@@ -135,32 +340,66 @@ class ForesightPlayer(BasePlayer):
         
         for alvo in sequencia:
 
-            caminho = MazeSimulado(estado).astar(estado.player.position, alvo)
-            if not caminho:
+            score_trecho = self._percorrer(estado, alvo)
+            if score_trecho is None:
                 return -float('inf')
-            
-            # Atualiza estado após caminho
-            for pos in caminho:
-                estado.player.position = pos
-                estado.player.battery -= 1
-                if estado.player.battery >= 0:
-                    score_total -= 1
-                else:
-                    score_total -= 5
-                if pos == estado.recharger:
-                    estado.player.battery = 60
-            
-            # Remove o alvo do estado simulado após processamento
-            if alvo in estado.packages:
-                estado.packages.remove(alvo)
-                estado.player.cargo += 1
-            elif alvo in estado.goals and estado.player.cargo > 0:
-                estado.goals.remove(alvo)
-                estado.player.cargo -= 1
-                score_total += 50
+            score_total += score_trecho
+            score_total += self._processar_alvo_simulado(estado, alvo)
         
         return score_total
 
+    def _opcoes(self, estado):
+        """Alvos considerados a partir de um estado, como em _gerar_sequencias."""
+        opcoes = []
+        if estado.player.cargo < 4:
+            opcoes.extend(estado.packages)
+        if estado.player.cargo > 0:
+            opcoes.extend(estado.goals)
+        if estado.recharger:
+            opcoes.append(estado.recharger)
+        return opcoes
+
+    def _processar_alvo_simulado(self, estado, alvo):
+        """Remove o alvo do estado simulado após processamento e retorna o bônus de entrega."""
+        if alvo in estado.packages:
+            estado.packages.remove(alvo)
+            estado.player.cargo += 1
+        elif alvo in estado.goals and estado.player.cargo > 0:
+            estado.goals.remove(alvo)
+            estado.player.cargo -= 1
+            return 50
+        return 0
+
+    def _percorrer(self, estado, alvo):
+        """
+        Move o jogador simulado até o alvo e retorna a pontuação do trecho, ou
+        None se o alvo for inalcançável.
+        """
+        if self.tabela is not None and self.tabela.cobre(estado.player.position, alvo):
+            trecho = self.tabela.trecho(estado.player.position, alvo)
+            if trecho is None:
+                return None
+            score, estado.player.battery = custo_trecho(estado.player.battery, *trecho)
+            estado.player.position = list(alvo)
+            return score
+
+        caminho = MazeSimulado(estado).astar(estado.player.position, alvo)
+        if not caminho:
+            return None
+
+        # Atualiza estado após caminho
+        score = 0
+        for pos in caminho:
+            estado.player.position = pos
+            estado.player.battery -= 1
+            if estado.player.battery >= 0:
+                score -= 1
+            else:
+                score -= 5
+            if pos == estado.recharger:
+                estado.player.battery = 60
+        return score
+
     def _clonar_estado(self, world):
         # Clona o estado incluindo obstáculos
         class EstadoSimulado:
@@ -176,24 +415,285 @@ class ForesightPlayer(BasePlayer):
                 })()
         return EstadoSimulado(world)
     
+class BeamForesightPlayer(ForesightPlayer):
+    """
+    Variante de ForesightPlayer com busca em feixe. Em vez de enumerar todas as
+    sequências até a profundidade M, mantém a cada nível apenas as
+    'largura_feixe' sequências parciais mais promissoras, ordenadas pela
+    pontuação acumulada mais uma estimativa otimista da recompensa restante.
+    O custo cresce linearmente com M (largura x ramificação por nível); com
+    largura suficiente o resultado é o mesmo da busca exaustiva.
+    """
+    def __init__(self, position, foresight_depth=1, recalcular_por_movimento=False, largura_feixe=8):
+        super().__init__(position, foresight_depth, recalcular_por_movimento)
+        self.largura_feixe = largura_feixe
+
+    def escolher_alvo(self, world):
+        melhor_sequencia = self._buscar_feixe(world)
+        if self.recalcular_por_movimento:
+            return [melhor_sequencia[0]] if melhor_sequencia else None
+        return melhor_sequencia[:self.M]  # Retorna até M ações
+
+    def _buscar_feixe(self, world):
+        # Cada entrada: (score, sequencia, ordem, estado); 'ordem' guarda os índices
+        # das opções escolhidas e desempata como a ordem de geração de _gerar_sequencias
+        feixe = [(0, [], (), self._clonar_estado(world))]
+        candidatas = []
+        for nivel in range(self.M):
+            filhos = []
+            for score, sequencia, ordem, estado in feixe:
+                if not estado.goals:
+                    candidatas.append((score, sequencia, ordem, estado))
+                    continue
+                for i, alvo in enumerate(self._opcoes(estado)):
+                    # Ir ao ponto onde já está não gera caminho (mesma regra de PodaSequencias)
+                    if alvo == estado.player.position:
+                        continue
+                    novo_estado = self._clonar_estado(estado)
+                    score_trecho = self._percorrer(novo_estado, alvo)
+                    if score_trecho is None:
+                        continue
+                    score_trecho += self._processar_alvo_simulado(novo_estado, alvo)
+                    filhos.append((score + score_trecho, sequencia + [alvo], ordem + (i,), novo_estado))
+            restantes = self.M - nivel - 1
+            filhos.sort(key=lambda filho: (-(filho[0] + self._estimativa_otimista(filho[3], restantes)), filho[2]))
+            feixe = filhos[:self.largura_feixe]
+        candidatas.extend(feixe)
+
+        if not candidatas:
+            return []
+        melhor = min(candidatas, key=lambda candidata: (-candidata[0], candidata[2]))
+        return melhor[1]
+
+    @staticmethod
+    def _estimativa_otimista(estado, restantes):
+        """
+        Limite superior da recompensa das próximas 'restantes' ações: cada entrega
+        vale 50 e exige uma ação, e cada pacote a mais exige outra; o custo dos
+        passos é ignorado.
+        """
+        cargo = estado.player.cargo
+        entregas = min(len(estado.goals), cargo + len(estado.packages), restantes, (cargo + restantes) // 2)
+        return 50 * entregas
+
+class NoMCTS:
+    """Nó da árvore de MCTSPlayer: estado simulado após a sequência de alvos até ele."""
+    def __init__(self, estado, score, alvo=None, pai=None):
+        self.estado = estado
+        self.score = score        # Pontuação acumulada desde a raiz
+        self.alvo = alvo
+        self.pai = pai
+        self.filhos = []
+        self.nao_expandidos = None  # Alvos ainda não tentados (preenchido na primeira visita)
+        self.visitas = 0
+        self.soma = 0.0
+
+class MCTSPlayer(ForesightPlayer):
+    """
+    Planejador por Monte Carlo Tree Search sobre o mesmo estado simulado e as
+    mesmas regras de pontuação de _simular_sequencia. Seleção por UCT, simulações
+    (rollouts) gulosas no estilo de DefaultPlayer e orçamento fixo por decisão:
+    'iteracoes' e, opcionalmente, 'tempo_limite' em segundos. A latência da
+    decisão depende só do orçamento, não de uma profundidade.
+    """
+    def __init__(self, position, iteracoes=200, tempo_limite=None, exploracao=1.4):
+        super().__init__(position)
+        self.iteracoes = iteracoes
+        self.tempo_limite = tempo_limite
+        self.exploracao = exploracao
+        self.escala = 100  # Normaliza a pontuação no termo de exploração do UCT
+        self.passos_rollout = 12  # Máximo de alvos por rollout
+
+    def escolher_alvo(self, world):
+        if not world.goals:
+            return None
+        if self.tabela is None:
+            # Os rollouts avaliam muitos trechos: calcula a tabela uma vez por episódio
+            self.tabela = TabelaDistancias.calcular(world)
+
+        raiz = NoMCTS(self._clonar_estado(world), 0)
+        inicio = time.perf_counter()
+        for iteracao in range(self.iteracoes):
+            if self.tempo_limite is not None and time.perf_counter() - inicio >= self.tempo_limite:
+                break
+            no = self._selecionar(raiz)
+            recompensa = no.score + self._rollout(no.estado)
+            while no is not None:
+                no.visitas += 1
+                no.soma += recompensa
+                no = no.pai
+
+        if not raiz.filhos:
+            return None
+        melhor = max(raiz.filhos, key=lambda filho: filho.visitas)
+        return [melhor.alvo]
+
+    def _selecionar(self, no):
+        """Desce pela árvore com UCT até um nó com alvos não tentados, e o expande."""
+        while True:
+            if no.nao_expandidos is None:
+                no.nao_expandidos = [alvo for alvo in self._opcoes(no.estado) if alvo != no.estado.player.position] if no.estado.goals else []
+            while no.nao_expandidos:
+                alvo = no.nao_expandidos.pop(0)
+                estado = self._clonar_estado(no.estado)
+                score_trecho = self._percorrer(estado, alvo)
+                if score_trecho is None:
+                    continue
+                score_trecho += self._processar_alvo_simulado(estado, alvo)
+                filho = NoMCTS(estado, no.score + score_trecho, alvo, no)
+                no.filhos.append(filho)
+                return filho
+            if not no.filhos:
+                return no  # Nó terminal
+            log_visitas = math.log(no.visitas)
+            no = max(no.filhos, key=lambda filho: filho.soma / filho.visitas
+                     + self.exploracao * self.escala * math.sqrt(log_visitas / filho.visitas))
+
+    def _rollout(self, estado_original):
+        """Completa o episódio com a política gulosa de DefaultPlayer e retorna a pontuação obtida."""
+        estado = self._clonar_estado(estado_original)
+        score = 0
+        for _ in range(self.passos_rollout):
+            if not estado.goals:
+                break
+            candidatos = estado.packages if estado.player.cargo == 0 and estado.packages else estado.goals
+            sx, sy = estado.player.position
+            alvo = min(candidatos, key=lambda p: abs(p[0] - sx) + abs(p[1] - sy))
+            score_trecho = self._percorrer(estado, alvo)
+            if score_trecho is None:
+                break
+            score += score_trecho + self._processar_alvo_simulado(estado, alvo)
+        return score
+
+class HeldKarpPlayer(BasePlayer):
+    """
+    Planejador exato do episódio inteiro por programação dinâmica sobre máscaras
+    de bits (no estilo Held-Karp). O estado é (posição, pacotes coletados,
+    metas entregues); a carga é derivada das máscaras e, para cada estado,
+    guarda-se a fronteira de Pareto de (bateria, pontuação), já que mais bateria
+    nunca piora o restante do episódio. Isso dispensa discretizar a bateria e
+    dá o plano ótimo segundo as mesmas regras de _simular_sequencia.
+    """
+    def __init__(self, position):
+        super().__init__(position)
+        self.tabela = None  # TabelaDistancias; calculada no primeiro uso se não for fornecida
+
+    def escolher_alvo(self, world):
+        if not world.goals:
+            return None
+        tabela = self.tabela
+        pontos = world.packages + world.goals + ([world.recharger] if world.recharger else [])
+        if tabela is None or not all(tabela.cobre(self.position, p) for p in pontos):
+            tabela = self.tabela = TabelaDistancias.calcular(world)
+        plano = self._planejar(world, tabela)
+        return plano if plano else None
+
+    def _planejar(self, world, tabela):
+        packages = [tuple(p) for p in world.packages]
+        goals = [tuple(g) for g in world.goals]
+        recharger = tuple(world.recharger) if world.recharger else None
+        todas_metas = (1 << len(goals)) - 1
+
+        # Entradas da fronteira: (bateria, score, alvo, entrada_anterior)
+        camada = {(tuple(self.position), 0, 0): [(self.battery, 0, None, None)]}
+        finais = []
+        while camada:
+            # Visitas ao recharger dentro da mesma camada (nunca duas seguidas)
+            if recharger is not None:
+                recargas = {}
+                for (pos, coletados, entregues), fronteira in camada.items():
+                    if pos != recharger and entregues != todas_metas:
+                        self._expandir(tabela, pos, recharger, 0, fronteira, (recharger, coletados, entregues), recargas)
+                for chave, fronteira in recargas.items():
+                    for entrada in fronteira:
+                        self._inserir_pareto(camada.setdefault(chave, []), entrada)
+
+            proxima = {}
+            for (pos, coletados, entregues), fronteira in camada.items():
+                finais.append((bin(entregues).count('1'), fronteira))
+                if entregues == todas_metas:
+                    continue
+                cargo = self.cargo + bin(coletados).count('1') - bin(entregues).count('1')
+                if cargo < 4:
+                    for i, pkg in enumerate(packages):
+                        if not coletados & (1 << i):
+                            chave = (pkg, coletados | (1 << i), entregues)
+                            self._expandir(tabela, pos, pkg, 0, fronteira, chave, proxima)
+                if cargo > 0:
+                    for j, goal in enumerate(goals):
+                        if not entregues & (1 << j):
+                            chave = (goal, coletados, entregues | (1 << j))
+                            self._expandir(tabela, pos, goal, 50, fronteira, chave, proxima)
+            camada = proxima
+
+        # Melhor plano: o que mais entrega e, entre esses, o de maior pontuação
+        melhor = None
+        for entregas, fronteira in finais:
+            for entrada in fronteira:
+                if melhor is None or (entregas, entrada[1]) > melhor[0]:
+                    melhor = ((entregas, entrada[1]), entrada)
+        if melhor is None or melhor[0][0] == 0:
+            return []
+        plano = []
+        entrada = melhor[1]
+        while entrada[2] is not None:
+            plano.append(list(entrada[2]))
+            entrada = entrada[3]
+        plano.reverse()
+        return plano
+
+    def _expandir(self, tabela, pos, alvo, bonus, fronteira, chave, destino):
+        """Estende cada entrada da fronteira com o trecho pos -> alvo e a guarda em destino[chave]."""
+        trecho = tabela.trecho(pos, alvo)
+        if trecho is None:
+            return
+        for anterior in fronteira:
+            score_trecho, bateria = custo_trecho(anterior[0], *trecho)
+            self._inserir_pareto(destino.setdefault(chave, []), (bateria, anterior[1] + score_trecho + bonus, alvo, anterior))
+
+    @staticmethod
+    def _inserir_pareto(fronteira, nova):
+        for entrada in fronteira:
+            if entrada[0] >= nova[0] and entrada[1] >= nova[1]:
+                return
+        fronteira[:] = [e for e in fronteira if not (nova[0] >= e[0] and nova[1] >= e[1])]
+        fronteira.append(nova)
+
+# Estratégias de jogador disponíveis por nome (usado por simulacao.py)
+JOGADORES = {
+    'foresight': ForesightPlayer,
+    'feixe': BeamForesightPlayer,
+    'mcts': MCTSPlayer,
+    'heldkarp': HeldKarpPlayer,
+}
+
 # ==========================
 # CLASSE WORLD (MUNDO)
 # ==========================
 class World:
-    def __init__(self, seed=None):
-        if seed is not None:
-            random.seed(seed)
+    def __init__(self, seed=None, visual=True, layout=None):
+        """
+        Sem 'layout', gera o mundo a partir da seed (os layouts dos CSVs de
+        resultados). 'layout' recebe um mundo já gerado, (mapa, pacotes, metas,
+        jogador, recharger), p.ex. de geracao.layout_da_seed.
+        """
+        # Gerador próprio do mundo: a mesma sequência de random.seed(seed), mas
+        # sem estado global, de modo que vários mundos podem ser gerados em threads
+        self.rng = random.Random(seed)
         # Parâmetros do grid e janela
         self.maze_size = 30
         self.width = 600
         self.height = 600
+
+        # Número total de itens (pacotes) a serem entregues
+        self.total_items = 4
+
+        if layout is not None:
+            self._carregar_layout(layout)
+        else:
+            self._gerar_layout()
         self.block_size = self.width // self.maze_size
 
-        # Cria uma matriz 2D para planejamento de caminhos:
-        # 0 = livre, 1 = obstáculo
-        self.map = [[0 for _ in range(self.maze_size)] for _ in range(self.maze_size)]
-        # Geração de obstáculos com padrão de linha (assembly line)
-        self.generate_obstacles()
         # Gera a lista de paredes a partir da matriz
         self.walls = []
         for row in range(self.maze_size):
@@ -201,23 +701,41 @@ class World:
                 if self.map[row][col] == 1:
                     self.walls.append((col, row))
 
-        # Número total de itens (pacotes) a serem entregues
-        self.total_items = 4
+        # Alterações do mapa em tempo de execução (set_obstacle / clear_obstacle)
+        self.versao_mapa = 0
+        self.celulas_alteradas = []
+
+        # Sem modo visual não há janela (nem pygame): o mundo serve apenas para simulação
+        self.janela = None
+        if visual:
+            self.iniciar_janela()
+
+    def iniciar_janela(self):
+        # O pygame só é importado quando uma janela é aberta
+        from renderizacao import Janela
+        self.janela = Janela(self)
+
+    def _gerar_layout(self):
+        # Cria uma matriz 2D para planejamento de caminhos:
+        # 0 = livre, 1 = obstáculo
+        self.map = [[0 for _ in range(self.maze_size)] for _ in range(self.maze_size)]
+        # Geração de obstáculos com padrão de linha (assembly line)
+        self.generate_obstacles()
 
         # Geração dos locais de coleta (pacotes)
         self.packages = []
         # Aqui geramos 5 locais para coleta, garantindo uma opção extra
         while len(self.packages) < self.total_items + 1:
-            x = random.randint(0, self.maze_size - 1)
-            y = random.randint(0, self.maze_size - 1)
+            x = self.rng.randint(0, self.maze_size - 1)
+            y = self.rng.randint(0, self.maze_size - 1)
             if self.map[y][x] == 0 and [x, y] not in self.packages:
                 self.packages.append([x, y])
 
         # Geração dos locais de entrega (metas)
         self.goals = []
         while len(self.goals) < self.total_items:
-            x = random.randint(0, self.maze_size - 1)
-            y = random.randint(0, self.maze_size - 1)
+            x = self.rng.randint(0, self.maze_size - 1)
+            y = self.rng.randint(0, self.maze_size - 1)
             if self.map[y][x] == 0 and [x, y] not in self.goals and [x, y] not in self.packages:
                 self.goals.append([x, y])
 
@@ -227,26 +745,14 @@ class World:
         # Coloca o recharger (recarga de bateria) próximo ao centro (região 3x3)
         self.recharger = self.generate_recharger()
 
-        # Inicializa a janela do Pygame
-        pygame.init()
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Delivery Bot")
-
-        # Carrega imagens para pacote, meta e recharger a partir de arquivos
-        self.package_image = pygame.image.load("images/cargo.png")
-        self.package_image = pygame.transform.scale(self.package_image, (self.block_size, self.block_size))
-
-        self.goal_image = pygame.image.load("images/operator.png")
-        self.goal_image = pygame.transform.scale(self.goal_image, (self.block_size, self.block_size))
-
-        self.recharger_image = pygame.image.load("images/charging-station.png")
-        self.recharger_image = pygame.transform.scale(self.recharger_image, (self.block_size, self.block_size))
-
-        # Cores utilizadas para desenho (caso a imagem não seja usada)
-        self.wall_color = (100, 100, 100)
-        self.ground_color = (255, 255, 255)
-        self.player_color = (0, 255, 0)
-        self.path_color = (200, 200, 0)
+    def _carregar_layout(self, layout):
+        mapa, pacotes, metas, jogador, recharger = layout
+        self.maze_size = len(mapa)  # Layouts podem ter grids maiores que o padrão (p.ex. frota.py)
+        self.map = [list(row) for row in mapa]
+        self.packages = [list(pkg) for pkg in pacotes]
+        self.goals = [list(goal) for goal in metas]
+        self.player = ForesightPlayer(list(jogador))
+        self.recharger = list(recharger)
 
     def generate_obstacles(self):
         """
@@ -257,28 +763,28 @@ class World:
         """
         # Barragens horizontais curtas:
         for _ in range(7):
-            row = random.randint(5, self.maze_size - 6)
-            start = random.randint(0, self.maze_size - 10)
-            length = random.randint(5, 10)
+            row = self.rng.randint(5, self.maze_size - 6)
+            start = self.rng.randint(0, self.maze_size - 10)
+            length = self.rng.randint(5, 10)
             for col in range(start, start + length):
-                if random.random() < 0.7:
+                if self.rng.random() < 0.7:
                     self.map[row][col] = 1
 
         # Barragens verticais curtas:
         for _ in range(7):
-            col = random.randint(5, self.maze_size - 6)
-            start = random.randint(0, self.maze_size - 10)
-            length = random.randint(5, 10)
+            col = self.rng.randint(5, self.maze_size - 6)
+            start = self.rng.randint(0, self.maze_size - 10)
+            length = self.rng.randint(5, 10)
             for row in range(start, start + length):
-                if random.random() < 0.7:
+                if self.rng.random() < 0.7:
                     self.map[row][col] = 1
 
         # Obstáculo em bloco grande: bloco de tamanho 4x4 ou 6x6.
-        block_size = random.choice([4, 6])
+        block_size = self.rng.choice([4, 6])
         max_row = self.maze_size - block_size
         max_col = self.maze_size - block_size
-        top_row = random.randint(0, max_row)
-        top_col = random.randint(0, max_col)
+        top_row = self.rng.randint(0, max_row)
+        top_col = self.rng.randint(0, max_col)
         for r in range(top_row, top_row + block_size):
             for c in range(top_col, top_col + block_size):
                 self.map[r][c] = 1
@@ -286,8 +792,8 @@ class World:
     def generate_player(self):
         # Cria o jogador em uma célula livre que não seja de pacote ou meta.
         while True:
-            x = random.randint(0, self.maze_size - 1)
-            y = random.randint(0, self.maze_size - 1)
+            x = self.rng.randint(0, self.maze_size - 1)
+            y = self.rng.randint(0, self.maze_size - 1)
             if self.map[y][x] == 0 and [x, y] not in self.packages and [x, y] not in self.goals:
                 return ForesightPlayer([x, y])
 
@@ -297,15 +803,15 @@ class World:
         max_attempts = 100  # Limite de tentativas
         attempts = 0
         while attempts < max_attempts:
-            x = random.randint(center - 1, center + 1)
-            y = random.randint(center - 1, center + 1)
+            x = self.rng.randint(center - 1, center + 1)
+            y = self.rng.randint(center - 1, center + 1)
             if self.map[y][x] == 0 and [x, y] not in self.packages and [x, y] not in self.goals and [x, y] != self.player.position:
                 return [x, y]
             attempts += 1
         
         while True:
-            x = random.randint(0, self.maze_size - 1)
-            y = random.randint(0, self.maze_size - 1)
+            x = self.rng.randint(0, self.maze_size - 1)
+            y = self.rng.randint(0, self.maze_size - 1)
             if self.map[y][x] == 0 and [x, y] not in self.packages and [x, y] not in self.goals and [x, y] != self.player.position:
                 return [x, y]
 
@@ -315,52 +821,86 @@ class World:
             return self.map[y][x] == 0
         return False
 
-    def draw_world(self, path=None):
-        self.screen.fill(self.ground_color)
-        # Desenha os obstáculos (paredes)
-        for (x, y) in self.walls:
-            rect = pygame.Rect(x * self.block_size, y * self.block_size, self.block_size, self.block_size)
-            pygame.draw.rect(self.screen, self.wall_color, rect)
-        # Desenha os locais de coleta (pacotes) utilizando a imagem
-        for pkg in self.packages:
-            x, y = pkg
-            self.screen.blit(self.package_image, (x * self.block_size, y * self.block_size))
-        # Desenha os locais de entrega (metas) utilizando a imagem
-        for goal in self.goals:
-            x, y = goal
-            self.screen.blit(self.goal_image, (x * self.block_size, y * self.block_size))
-        # Desenha o recharger utilizando a imagem
-        if self.recharger:
-            x, y = self.recharger
-            self.screen.blit(self.recharger_image, (x * self.block_size, y * self.block_size))
-        # Desenha o caminho, se fornecido
-        if path:
-            for pos in path:
-                x, y = pos
-                rect = pygame.Rect(x * self.block_size + self.block_size // 4,
-                                   y * self.block_size + self.block_size // 4,
-                                   self.block_size // 2, self.block_size // 2)
-                pygame.draw.rect(self.screen, self.path_color, rect)
-        # Desenha o jogador (retângulo colorido)
-        x, y = self.player.position
-        rect = pygame.Rect(x * self.block_size, y * self.block_size, self.block_size, self.block_size)
-        pygame.draw.rect(self.screen, self.player_color, rect)
-        pygame.display.flip()
+    def set_obstacle(self, x, y):
+        """Transforma a célula (x, y) em obstáculo durante a execução (ValueError fora do grid)."""
+        self._alterar_celula(x, y, 1)
+
+    def clear_obstacle(self, x, y):
+        """Libera a célula (x, y) durante a execução (ValueError fora do grid)."""
+        self._alterar_celula(x, y, 0)
+
+    def _alterar_celula(self, x, y, valor):
+        # Sem esta checagem, índices negativos alterariam silenciosamente a célula do outro lado do grid
+        if not (0 <= x < self.maze_size and 0 <= y < self.maze_size):
+            raise ValueError(f"Célula ({x}, {y}) fora do grid {self.maze_size}x{self.maze_size}")
+        if self.map[y][x] == valor:
+            return
+        self.map[y][x] = valor
+        if valor == 1:
+            self.walls.append((x, y))
+        else:
+            self.walls.remove((x, y))
+        self.versao_mapa += 1
+        self.celulas_alteradas.append((x, y))
+
+    def consumir_alteracoes(self):
+        """Retorna e esquece as células alteradas desde a última chamada."""
+        alteradas = self.celulas_alteradas
+        self.celulas_alteradas = []
+        return alteradas
+
+    def capturar_estado(self, path=None):
+        """
+        Cópia imutável de tudo o que é desenhado. Permite que o renderizador
+        desenhe um quadro enquanto a simulação continua alterando o mundo.
+        """
+        return (
+            tuple(self.player.position),
+            tuple(tuple(pkg) for pkg in self.packages),
+            tuple(tuple(goal) for goal in self.goals),
+            tuple(self.recharger) if self.recharger else None,
+            tuple(tuple(pos) for pos in path) if path else (),
+            self.versao_mapa,
+        )
+
+    def draw_world(self, path=None, estado=None):
+        """
+        Desenha o mundo redesenhando apenas as células que mudaram desde o último
+        quadro (posição antiga e nova do jogador, itens coletados e caminho).
+        O primeiro quadro desenha a tela inteira a partir do fundo em cache.
+        Se 'estado' (de capturar_estado) for fornecido, desenha esse instantâneo
+        em vez do estado atual do mundo.
+        """
+        if self.janela is None:
+            self.iniciar_janela()
+        if estado is None:
+            estado = self.capturar_estado(path)
+        self.janela.desenhar(estado)
 
 # ==========================
 # CLASSE MAZE: Lógica do jogo e planejamento de caminhos (A*)
 # ==========================
 class Maze:
-    def __init__(self, seed=None):
-        self.world = World(seed)
+    def __init__(self, seed=None, visual=True, layout=None):
+        self.world = World(seed, visual=visual, layout=layout)
+        self.visual = visual
         self.running = True
         self.score = 0
         self.steps = 0
         self.recargas = 0
-        self.delay = 100  # milissegundos entre movimentos
+        self.delay = 100  # milissegundos entre quadros desenhados
+        self.max_quadros_pendentes = 1000  # quadros acima disso (os mais antigos) são descartados
+        self.manter_janela = True  # Mantém o último quadro na tela até a janela ser fechada
+        self._quadros = None
+        self.metricas = None  # Medidas por _simular ao fim do episódio, sem o tempo de exibição
         self.path = []
         self.num_deliveries = 0  # contagem de entregas realizadas
         self.dijkstra_distances = {}
+        # Obstáculos dinâmicos: função chamada com o Maze antes de cada passo, que pode
+        # alterar o mapa com world.set_obstacle / world.clear_obstacle
+        self.obstaculos_dinamicos = None
+        self.motor = None  # MotorIncremental (replanejamento.py), usado com obstáculos dinâmicos
+        self._tabela_desatualizada = False
 
     def dijkstra(self, start):
         """Calcula as distâncias mínimas de 'start' para todos os pontos usando Dijkstra."""
@@ -514,40 +1054,126 @@ class Maze:
         return []
 
     def game_loop(self):
-        # O jogo termina quando o número de entregas realizadas é igual ao total de itens.
-        while self.running:
-            if self.num_deliveries >= self.world.total_items:
-                self.running = False
-                break
+        """
+        Executa o episódio. No modo visual a simulação roda em uma thread separada
+        e publica instantâneos do mundo em uma fila; a thread principal (exigida
+        pelo pygame) os reproduz a uma taxa fixa, descartando quadros só se a fila
+        transbordar. As métricas e o tempo são medidos em _simular, de modo que
+        não dependem de haver janela aberta nem da duração da reprodução.
+        """
+        if not self.visual:
+            self._simular()
+            return
 
-            # Obtém a sequência de ações do jogador
-            sequencia_acoes = self.world.player.escolher_alvo(self.world)
-            if not sequencia_acoes:
-                self.running = False
-                break
+        self._quadros = deque(maxlen=self.max_quadros_pendentes)
+        simulacao = threading.Thread(target=self._simular, daemon=True)
+        simulacao.start()
+        self.world.janela.exibir_quadros(self._quadros, self.delay, self._parar, self.manter_janela)
+        simulacao.join()
+        self.world.janela.fechar()
 
-            # Executa cada ação na sequência
-            for alvo in sequencia_acoes:
+    def _simular(self):
+        # O jogo termina quando o número de entregas realizadas é igual ao total de itens.
+        inicio = time.perf_counter()
+        try:
+            while self.running:
                 if self.num_deliveries >= self.world.total_items:
+                    self.running = False
                     break
 
-                self.path = self.astar(self.world.player.position, alvo)
-                if not self.path:
-                    print("Caminho inalcançável para", alvo)
+                if self._tabela_desatualizada:
+                    self._atualizar_tabela_jogador()
+
+                # Obtém a sequência de ações do jogador
+                sequencia_acoes = self.world.player.escolher_alvo(self.world)
+                if not sequencia_acoes:
+                    self.running = False
                     break
-                
-                # Move o jogador pelo caminho
-                for pos in self.path:
-                    self._atualizar_estado(pos)
-                    self.world.draw_world(self.path)
-                    pygame.time.wait(self.delay)
-                
-                # Processa coleta/entrega após alcançar o alvo
-                self._processar_alvo(alvo)
-            
-            print(f"Passos: {self.steps}, Pontuação: {self.score}, Bateria: {self.world.player.battery}")
 
-        pygame.quit()
+                # Executa cada ação na sequência
+                for alvo in sequencia_acoes:
+                    if self.num_deliveries >= self.world.total_items or not self.running:
+                        break
+
+                    if self.obstaculos_dinamicos is not None:
+                        if not self._percorrer_dinamico(alvo):
+                            print("Caminho inalcançável para", alvo)
+                            break
+                    else:
+                        self.path = self.astar(self.world.player.position, alvo)
+                        if not self.path:
+                            print("Caminho inalcançável para", alvo)
+                            break
+
+                        # Move o jogador pelo caminho: célula a célula com janela,
+                        # ou o trecho inteiro de uma vez sem ela
+                        if self.visual:
+                            for pos in self.path:
+                                self._atualizar_estado(pos)
+                                self._publicar_quadro()
+                        else:
+                            self._avancar_trecho(self.path)
+
+                    # Processa coleta/entrega após alcançar o alvo
+                    self._processar_alvo(alvo)
+                    self._publicar_quadro()
+
+                print(f"Passos: {self.steps}, Pontuação: {self.score}, Bateria: {self.world.player.battery}")
+        finally:
+            self.metricas = {
+                'pontuacao': self.score,
+                'passos': self.steps,
+                'bateria_final': self.world.player.battery,
+                'recargas': self.recargas,
+                'tempo_simulacao': time.perf_counter() - inicio,
+            }
+            # Sinaliza ao renderizador que não haverá mais quadros
+            if self._quadros is not None:
+                self._quadros.append(None)
+
+    def _percorrer_dinamico(self, alvo):
+        """
+        Percorre o trecho até o alvo com o mapa podendo mudar a cada passo. Após
+        uma alteração, os campos de distância do motor incremental são reparados
+        apenas na região afetada e o restante do caminho é refeito a partir da
+        posição atual. Retorna False se o alvo ficar inalcançável.
+        """
+        if self.motor is None:
+            from replanejamento import MotorIncremental
+            self.motor = MotorIncremental(self.world)
+            # Os campos já nascem com o mapa atual
+            if self.world.consumir_alteracoes():
+                self._tabela_desatualizada = True
+
+        caminho = self.path = self.motor.caminho(self.world.player.position, alvo)
+        while caminho:
+            self.obstaculos_dinamicos(self)
+            alteradas = self.world.consumir_alteracoes()
+            if alteradas:
+                self.motor.aplicar_alteracoes(alteradas)
+                self._tabela_desatualizada = True
+                caminho = self.path = self.motor.caminho(self.world.player.position, alvo)
+            if not caminho:
+                return False
+            self._atualizar_estado(caminho[0])
+            caminho = caminho[1:]
+            self._publicar_quadro()
+        return True
+
+    def _atualizar_tabela_jogador(self):
+        # A tabela dos planejadores passa a vir dos campos reparados, sem refazer o A*
+        if hasattr(self.world.player, 'tabela'):
+            self.world.player.tabela = self.motor.tabela()
+        self._tabela_desatualizada = False
+
+    def _publicar_quadro(self):
+        # A fila tem tamanho máximo: se a reprodução ficar max_quadros_pendentes quadros
+        # atrás da simulação, os mais antigos são descartados
+        if self._quadros is not None:
+            self._quadros.append(self.world.capturar_estado(self.path))
+
+    def _parar(self):
+        self.running = False
 
     def _atualizar_estado(self, pos):
         self.world.player.position = pos
@@ -561,6 +1187,22 @@ class Maze:
             self.world.player.battery = 60
             self.recargas += 1
 
+    def _avancar_trecho(self, caminho):
+        """
+        Aplica um trecho inteiro de uma vez, com o mesmo resultado de chamar
+        _atualizar_estado para cada célula: passos, bateria e pontuação vêm de
+        custo_trecho a partir do comprimento do caminho e do índice do recharger nele.
+        """
+        player = self.world.player
+        recharger = self.world.recharger
+        indice_recarga = caminho.index(recharger) if recharger in caminho else -1
+        score, player.battery = custo_trecho(player.battery, len(caminho), indice_recarga)
+        self.score += score
+        self.steps += len(caminho)
+        if indice_recarga >= 0:
+            self.recargas += 1
+        player.position = caminho[-1]
+
     def _processar_alvo(self, alvo):
         if alvo in self.world.packages:
             self.world.player.cargo += 1
@@ -578,6 +1220,7 @@ class MazeSimulado:
         self.map = [row.copy() for row in estado_simulado.map]
 
     def astar(self, start, goal):
+        size = len(self.map)
         neighbors = [(1, 0), (-1, 0), (0, 1), (0, -1)]
         close_set = set()
         came_from = {}
@@ -598,7 +1241,7 @@ class MazeSimulado:
             close_set.add(current)
             for dx, dy in neighbors:
                 neighbor = (current[0] + dx, current[1] + dy)
-                if 0 <= neighbor[0] < 30 and 0 <= neighbor[1] < 30:
+                if 0 <= neighbor[0] < size and 0 <= neighbor[1] < size:
                     if self.map[neighbor[1]][neighbor[0]] == 1:
                         continue
                     tentative_g = gscore.get(current, float('inf')) + 1
@@ -625,8 +1268,13 @@ if __name__ == "__main__":
         default=None,
         help="Valor do seed para recriar o mesmo mundo (opcional)."
     )
+    parser.add_argument(
+        "--sem-janela",
+        action="store_true",
+        help="Executa sem abrir a janela (não carrega o pygame)."
+    )
     args = parser.parse_args()
     
-    maze = Maze(seed=args.seed)
+    maze = Maze(seed=args.seed, visual=not args.sem_janela)
     maze.game_loop()
 
@@ -0,0 +1,147 @@
+"""
+Renderização com pygame do mundo do Delivery Bot.
+
+Este é o único módulo que importa pygame. main.py só o carrega quando uma
+janela é de fato aberta, de modo que a simulação (World, planejadores, Maze)
+roda sem pygame e sem SDL.
+"""
+import pygame
+
+
+class Janela:
+    """
+    Janela do pygame que desenha instantâneos do mundo (World.capturar_estado),
+    redesenhando apenas as células que mudaram entre um quadro e outro.
+    """
+    def __init__(self, world):
+        self.block_size = world.block_size
+        self.width = world.width
+        self.height = world.height
+        self.walls = world.walls  # Mesma lista do World: reflete set_obstacle / clear_obstacle
+
+        # Inicializa a janela do Pygame
+        pygame.init()
+        self.screen = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption("Delivery Bot")
+
+        # Carrega imagens para pacote, meta e recharger a partir de arquivos
+        self.package_image = pygame.image.load("images/cargo.png")
+        self.package_image = pygame.transform.scale(self.package_image, (self.block_size, self.block_size))
+
+        self.goal_image = pygame.image.load("images/operator.png")
+        self.goal_image = pygame.transform.scale(self.goal_image, (self.block_size, self.block_size))
+
+        self.recharger_image = pygame.image.load("images/charging-station.png")
+        self.recharger_image = pygame.transform.scale(self.recharger_image, (self.block_size, self.block_size))
+
+        # Cores utilizadas para desenho (caso a imagem não seja usada)
+        self.wall_color = (100, 100, 100)
+        self.ground_color = (255, 255, 255)
+        self.player_color = (0, 255, 0)
+        self.path_color = (200, 200, 0)
+
+        # Camada estática (chão e paredes) pré-renderizada no primeiro quadro e
+        # conteúdo dinâmico desenhado em cada célula no último quadro, usados
+        # para redesenhar apenas as células que mudaram (dirty rectangles).
+        self._fundo = None
+        self._versao_fundo = None
+        self._celulas_desenhadas = {}
+
+    def _renderizar_fundo(self):
+        """Desenha uma única vez o chão e as paredes em uma superfície separada."""
+        fundo = pygame.Surface((self.width, self.height))
+        fundo.fill(self.ground_color)
+        for (x, y) in list(self.walls):
+            rect = pygame.Rect(x * self.block_size, y * self.block_size, self.block_size, self.block_size)
+            pygame.draw.rect(fundo, self.wall_color, rect)
+        return fundo
+
+    def _conteudo_celulas(self, estado):
+        """
+        Retorna {(x, y): (imagem, no_caminho, jogador)} apenas para as células
+        que têm algo além do fundo estático.
+        """
+        posicao, packages, goals, recharger, path, _ = estado
+        celulas = {}
+        for pkg in packages:
+            celulas[pkg] = [self.package_image, False, False]
+        for goal in goals:
+            celulas[goal] = [self.goal_image, False, False]
+        if recharger:
+            celulas[recharger] = [self.recharger_image, False, False]
+        for pos in path:
+            celulas.setdefault(pos, [None, False, False])[1] = True
+        celulas.setdefault(posicao, [None, False, False])[2] = True
+        return {pos: tuple(conteudo) for pos, conteudo in celulas.items()}
+
+    def _desenhar_celula(self, pos, conteudo):
+        x, y = pos
+        rect = pygame.Rect(x * self.block_size, y * self.block_size, self.block_size, self.block_size)
+        # Restaura o fundo estático da célula antes de desenhar por cima
+        self.screen.blit(self._fundo, rect, rect)
+        if conteudo is not None:
+            imagem, no_caminho, jogador = conteudo
+            if imagem is not None:
+                self.screen.blit(imagem, rect)
+            if no_caminho:
+                marca = pygame.Rect(x * self.block_size + self.block_size // 4,
+                                    y * self.block_size + self.block_size // 4,
+                                    self.block_size // 2, self.block_size // 2)
+                pygame.draw.rect(self.screen, self.path_color, marca)
+            if jogador:
+                pygame.draw.rect(self.screen, self.player_color, rect)
+        return rect
+
+    def desenhar(self, estado):
+        """
+        Desenha o instantâneo redesenhando apenas as células que mudaram desde o
+        último quadro (posição antiga e nova do jogador, itens coletados e
+        caminho). O primeiro quadro desenha a tela inteira a partir do fundo em cache.
+        """
+        celulas = self._conteudo_celulas(estado)
+        versao_mapa = estado[-1]
+        if self._fundo is None or versao_mapa != self._versao_fundo:
+            # Primeiro quadro ou mapa alterado: refaz o fundo e redesenha tudo
+            self._fundo = self._renderizar_fundo()
+            self._versao_fundo = versao_mapa
+            self.screen.blit(self._fundo, (0, 0))
+            for pos, conteudo in celulas.items():
+                self._desenhar_celula(pos, conteudo)
+            pygame.display.flip()
+        else:
+            anteriores = self._celulas_desenhadas
+            rects = [
+                self._desenhar_celula(pos, celulas.get(pos))
+                for pos in anteriores.keys() | celulas.keys()
+                if anteriores.get(pos) != celulas.get(pos)
+            ]
+            if rects:
+                pygame.display.update(rects)
+        self._celulas_desenhadas = celulas
+
+    def exibir_quadros(self, quadros, delay, ao_fechar, manter_aberta=True):
+        """
+        Reproduz os instantâneos publicados pela simulação na ordem em que
+        chegaram, um a cada 'delay' ms, até receber None. A fila só perde quadros
+        (os mais antigos) se transbordar. Com 'manter_aberta', o último quadro
+        fica na tela até o usuário fechar a janela; 'ao_fechar' é chamado quando
+        ele a fecha.
+        """
+        relogio = pygame.time.Clock()
+        fps = 1000 / delay if delay > 0 else 0
+        terminou = False
+        while not (terminou and not manter_aberta):
+            for evento in pygame.event.get():
+                if evento.type == pygame.QUIT:
+                    ao_fechar()
+                    return
+            if not terminou and quadros:
+                quadro = quadros.popleft()
+                if quadro is None:
+                    terminou = True
+                else:
+                    self.desenhar(quadro)
+            relogio.tick(fps)
+
+    def fechar(self):
+        pygame.quit()
@@ -0,0 +1,153 @@
+"""
+Replanejamento incremental para mapas com obstáculos dinâmicos.
+
+CampoDistancias mantém, com LPA* (Lifelong Planning A*) sem heurística, o
+campo de distâncias de todas as células até um alvo. Quando células mudam
+(World.set_obstacle / World.clear_obstacle), só os vértices cuja distância
+realmente muda são reexpandidos, em vez de refazer a busca inteira.
+
+MotorIncremental guarda um campo por alvo (pontos de interesse e alvos dos
+trechos), repara todos eles após cada alteração e deriva deles os caminhos
+e a TabelaDistancias usada pelos planejadores.
+"""
+import heapq
+
+from main import TabelaDistancias
+
+INF = float('inf')
+VIZINHOS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+class CampoDistancias:
+    """
+    Distância (em passos) de cada célula livre até 'alvo', mantida por LPA*.
+    g e rhs são listas indexadas por y * size + x.
+    """
+    def __init__(self, mapa, alvo):
+        self.mapa = mapa  # Referência ao World.map: as alterações são lidas dele
+        self.size = len(mapa)
+        self.alvo = tuple(alvo)
+        self._indice_alvo = self._indice(self.alvo)
+        n = self.size * self.size
+        self.g = [INF] * n
+        self.rhs = [INF] * n
+        self.fila = []
+        self.expansoes = 0  # Vértices expandidos desde a criação (medida do custo das buscas)
+        self._atualizar_vertice(self._indice_alvo)
+        self._calcular()
+
+    def _indice(self, pos):
+        return pos[1] * self.size + pos[0]
+
+    def _livre(self, indice):
+        return self.mapa[indice // self.size][indice % self.size] == 0
+
+    def _vizinhos(self, indice):
+        x, y = indice % self.size, indice // self.size
+        for dx, dy in VIZINHOS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.size and 0 <= ny < self.size:
+                yield ny * self.size + nx
+
+    def _atualizar_vertice(self, indice):
+        if not self._livre(indice):
+            self.rhs[indice] = INF
+        elif indice == self._indice_alvo:
+            self.rhs[indice] = 0
+        else:
+            self.rhs[indice] = min((self.g[v] + 1 for v in self._vizinhos(indice)), default=INF)
+        # Fila com remoção preguiçosa: entradas desatualizadas são ignoradas ao sair
+        if self.g[indice] != self.rhs[indice]:
+            heapq.heappush(self.fila, (min(self.g[indice], self.rhs[indice]), indice))
+
+    def _calcular(self):
+        while self.fila:
+            chave, indice = heapq.heappop(self.fila)
+            g, rhs = self.g[indice], self.rhs[indice]
+            if g == rhs or chave != min(g, rhs):
+                continue
+            self.expansoes += 1
+            if g > rhs:
+                self.g[indice] = rhs
+                for vizinho in self._vizinhos(indice):
+                    self._atualizar_vertice(vizinho)
+            else:
+                self.g[indice] = INF
+                self._atualizar_vertice(indice)
+                for vizinho in self._vizinhos(indice):
+                    self._atualizar_vertice(vizinho)
+
+    def atualizar(self, celulas):
+        """Repara o campo após a mudança das células [(x, y), ...] no mapa."""
+        for celula in celulas:
+            indice = self._indice(celula)
+            self._atualizar_vertice(indice)
+            for vizinho in self._vizinhos(indice):
+                self._atualizar_vertice(vizinho)
+        self._calcular()
+
+    def distancia(self, pos):
+        """Comprimento do caminho de pos até o alvo (inf se inalcançável)."""
+        if tuple(pos) == self.alvo:
+            return 0
+        return min((self.g[v] + 1 for v in self._vizinhos(self._indice(pos)) if self._livre(v)), default=INF)
+
+    def caminho(self, origem):
+        """
+        Caminho de origem até o alvo no mesmo formato de Maze.astar (sem a
+        origem, com o alvo), descendo pelo campo; [] se inalcançável.
+        """
+        if tuple(origem) == self.alvo or self.distancia(origem) == INF:
+            return []
+        caminho = []
+        atual = self._indice(origem)
+        while atual != self._indice_alvo:
+            atual = min((v for v in self._vizinhos(atual) if self._livre(v)), key=lambda v: self.g[v])
+            caminho.append([atual % self.size, atual // self.size])
+        return caminho
+
+
+class MotorIncremental:
+    """Campos de distância por alvo de um World, reparados a cada alteração do mapa."""
+    def __init__(self, world):
+        self.world = world
+        self.campos = {}
+
+    def campo(self, alvo):
+        chave = tuple(alvo)
+        if chave not in self.campos:
+            self.campos[chave] = CampoDistancias(self.world.map, chave)
+        return self.campos[chave]
+
+    def caminho(self, origem, alvo):
+        return self.campo(alvo).caminho(origem)
+
+    def aplicar_alteracoes(self, celulas):
+        """Repara todos os campos já criados; retorna o número de vértices reexpandidos."""
+        expansoes = 0
+        for campo in self.campos.values():
+            antes = campo.expansoes
+            campo.atualizar(celulas)
+            expansoes += campo.expansoes - antes
+        return expansoes
+
+    def tabela(self):
+        """
+        TabelaDistancias do mapa atual derivada dos campos (sem A*), para os
+        pontos de interesse atuais do mundo e a posição do jogador.
+        """
+        world = self.world
+        pontos = list(world.packages) + list(world.goals) + [world.player.position, world.recharger]
+        recharger = list(world.recharger)
+        comprimentos = []
+        indices_recarga = []
+        for origem in pontos:
+            linha_comprimentos = []
+            linha_indices = []
+            for destino in pontos:
+                caminho = self.caminho(origem, destino)
+                linha_comprimentos.append(len(caminho) if caminho else -1)
+                linha_indices.append(caminho.index(recharger) if recharger in caminho else -1)
+            comprimentos.append(linha_comprimentos)
+            indices_recarga.append(linha_indices)
+        return TabelaDistancias(pontos, comprimentos, indices_recarga)
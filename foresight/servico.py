@@ -0,0 +1,188 @@
+"""
+Serviço local de simulação.
+
+Mantém um pool de processos aquecido (main.py e simulacao.py importados e o
+armazém já aberto em cada worker) e atende, por um socket Unix, lotes de
+tarefas (seed, profundidade, jogador, modo de recálculo). Os resultados são
+enviados de volta um a um, à medida que terminam. Tarefas idênticas em
+andamento, do mesmo cliente ou de clientes diferentes, são executadas uma
+única vez.
+
+Protocolo (JSON, uma mensagem por linha):
+  cliente -> {"tarefas": [{"seed": 1, "profundidade": 2, "jogador": "foresight",
+                           "recalcular_por_movimento": true}, ...]}
+  serviço -> {"tarefa": {...}, "resultado": {...}} para cada tarefa, na ordem
+             em que terminam ("resultado" é null se a simulação falhou),
+             seguido de {"fim": true, "executadas": n, "reaproveitadas": m}
+             (totais do serviço desde o início). Um pedido inválido (ou maior
+             que LIMITE_MENSAGEM) recebe apenas {"erro": "..."}.
+
+Uso:
+  python servico.py servir
+  python servico.py enviar --seeds 1-100 --profundidades 1,2,3
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+SOCKET = 'simulacao.sock'
+# Tamanho máximo de uma linha do protocolo: o pedido traz o lote inteiro em uma linha
+# (uma varredura de 10000 seeds x 4 profundidades tem uns 4 MB de JSON)
+LIMITE_MENSAGEM = 256 * 1024 * 1024
+CAMPOS_TAREFA = ('seed', 'profundidade', 'recalcular_por_movimento', 'jogador', 'largura_feixe', 'iteracoes_mcts', 'orcamento_nos')
+PADROES_TAREFA = {'recalcular_por_movimento': True, 'jogador': 'foresight', 'largura_feixe': 0, 'iteracoes_mcts': 0, 'orcamento_nos': 0}
+
+
+def chave_tarefa(tarefa):
+    """Tupla na ordem dos argumentos de simulacao.executar_tarefa, com os padrões preenchidos."""
+    return tuple(tarefa.get(campo, PADROES_TAREFA.get(campo)) for campo in CAMPOS_TAREFA)
+
+
+def _aquecer():
+    """Inicializador dos workers: importa a simulação e abre o armazém uma única vez."""
+    import simulacao
+    simulacao.abrir_armazem()
+
+
+def _executar(chave):
+    import simulacao
+    return simulacao.executar_tarefa(*chave)
+
+
+class Servico:
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count()
+        self.executor = None
+        self.em_andamento = {}  # chave da tarefa -> futuro compartilhado
+        self.executadas = 0
+        self.reaproveitadas = 0
+
+    async def iniciar(self):
+        self.executor = ProcessPoolExecutor(self.workers, initializer=_aquecer)
+        # Os processos do pool só nascem sob demanda: cria todos antes do primeiro pedido
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.workers)))
+
+    def fechar(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    def executar(self, chave):
+        """Futuro do resultado da tarefa; reaproveita o de uma tarefa idêntica em andamento."""
+        futuro = self.em_andamento.get(chave)
+        if futuro is not None:
+            self.reaproveitadas += 1
+            return futuro
+        self.executadas += 1
+        futuro = asyncio.get_running_loop().run_in_executor(self.executor, _executar, chave)
+        self.em_andamento[chave] = futuro
+        futuro.add_done_callback(lambda _: self.em_andamento.pop(chave, None))
+        return futuro
+
+    async def atender(self, leitor, escritor):
+        try:
+            pedido = json.loads(await leitor.readline())
+            chaves = [chave_tarefa(tarefa) for tarefa in pedido['tarefas']]
+
+            async def aguardar(chave):
+                # shield: um cliente que desconecta não cancela a tarefa de outro
+                return chave, await asyncio.shield(self.executar(chave))
+
+            for pronto in asyncio.as_completed([aguardar(chave) for chave in chaves]):
+                chave, resultado = await pronto
+                mensagem = {'tarefa': dict(zip(CAMPOS_TAREFA, chave)), 'resultado': resultado}
+                escritor.write((json.dumps(mensagem) + '\n').encode())
+                await escritor.drain()
+            fim = {'fim': True, 'executadas': self.executadas, 'reaproveitadas': self.reaproveitadas}
+            escritor.write((json.dumps(fim) + '\n').encode())
+            await escritor.drain()
+        except ConnectionError as e:
+            print(f'Pedido interrompido: {e!r}')
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # Linha acima do limite, JSON inválido ou tarefas fora do formato
+            print(f'Pedido inválido: {e!r}')
+            try:
+                escritor.write((json.dumps({'erro': f'Pedido inválido: {e}'}) + '\n').encode())
+                await escritor.drain()
+            except ConnectionError:
+                pass
+        finally:
+            escritor.close()
+
+    async def servir(self, caminho=SOCKET):
+        await self.iniciar()
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        servidor = await asyncio.start_unix_server(self.atender, path=caminho, limit=LIMITE_MENSAGEM)
+        print(f'Servindo em {caminho} com {self.workers} workers')
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            self.fechar()
+
+
+async def enviar(tarefas, caminho=SOCKET):
+    """Envia um lote ao serviço e produz as mensagens de resultado à medida que chegam."""
+    leitor, escritor = await asyncio.open_unix_connection(caminho, limit=LIMITE_MENSAGEM)
+    try:
+        escritor.write((json.dumps({'tarefas': tarefas}) + '\n').encode())
+        await escritor.drain()
+        while True:
+            linha = await leitor.readline()
+            if not linha:
+                raise ConnectionError('O serviço encerrou a conexão antes do fim do lote')
+            mensagem = json.loads(linha)
+            if 'erro' in mensagem:
+                raise ValueError(mensagem['erro'])
+            if mensagem.get('fim'):
+                break
+            yield mensagem
+    finally:
+        escritor.close()
+
+
+def _intervalo(texto):
+    """'1-100' ou '1,2,5' -> lista de inteiros."""
+    if '-' in texto:
+        inicio, fim = texto.split('-')
+        return list(range(int(inicio), int(fim) + 1))
+    return [int(valor) for valor in texto.split(',')]
+
+
+async def _enviar_cli(args):
+    tarefas = [
+        {'seed': seed, 'profundidade': profundidade, 'jogador': args.jogador,
+         'recalcular_por_movimento': not args.sem_recalcular}
+        for seed in _intervalo(args.seeds)
+        for profundidade in _intervalo(args.profundidades)
+    ]
+    async for mensagem in enviar(tarefas, args.socket):
+        print(json.dumps(mensagem['resultado'] or mensagem['tarefa']), flush=True)
+
+
+# ==========================
+# PONTO DE ENTRADA PRINCIPAL
+# ==========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço local de simulação com pool de processos aquecido.")
+    parser.add_argument("--socket", default=SOCKET, help="Caminho do socket Unix.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    servir = comandos.add_parser("servir", help="Inicia o serviço.")
+    servir.add_argument("--workers", type=int, default=None, help="Processos no pool (padrão: núcleos).")
+    cliente = comandos.add_parser("enviar", help="Envia um lote e imprime os resultados (JSON por linha).")
+    cliente.add_argument("--seeds", default="1-10", help="Intervalo '1-100' ou lista '1,2,5'.")
+    cliente.add_argument("--profundidades", default="1", help="Intervalo ou lista de profundidades.")
+    cliente.add_argument("--jogador", default="foresight", help="Chave de main.JOGADORES.")
+    cliente.add_argument("--sem-recalcular", action="store_true", help="recalcular_por_movimento=False.")
+    args = parser.parse_args()
+
+    if args.comando == "servir":
+        try:
+            asyncio.run(Servico(args.workers).servir(args.socket))
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(_enviar_cli(args))
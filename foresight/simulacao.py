@@ -1,28 +1,83 @@
+import os
 import time
 import csv
-from concurrent.futures import ProcessPoolExecutor
-from main import Maze  # Importa a classe Maze do seu código principal
+import json
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from main import Maze, JOGADORES  # Importa a classe Maze do seu código principal
+from armazem import Armazem, caminho_versionado, escrever_armazem
+from cache_resultados import CacheResultados, chave as chave_cache
 
-def executar_simulacao(seed, profundidade, recalcular_por_movimento):
+_armazem = None  # Armazém mapeado em memória, aberto uma vez por processo
+
+def abrir_armazem():
+    global _armazem
+    if _armazem is None and ARQUIVO_ARMAZEM is not None:
+        # Só o armazém gravado pelo código atual (escrever_armazem usa o mesmo caminho)
+        caminho = caminho_versionado(ARQUIVO_ARMAZEM, MUNDOS_EM_LOTE)
+        if os.path.exists(caminho):
+            _armazem = Armazem(caminho)
+    return _armazem
+
+def executar_simulacao(seed, profundidade, recalcular_por_movimento, jogador='foresight', largura_feixe=0, iteracoes_mcts=0, orcamento_nos=0):
     inicio = time.time()
     
-    # Configura o player com a profundidade desejada
-    maze = Maze(seed)
+    armazem = abrir_armazem()
+    if DIRETORIO_CACHE is not None:
+        # Episódio já simulado com esta configuração e este código: devolve o resultado guardado
+        mundos = 'lote' if MUNDOS_EM_LOTE and armazem is not None and seed in armazem else 'seed'
+        endereco = chave_cache(seed, profundidade, recalcular_por_movimento, jogador, largura_feixe, iteracoes_mcts, mundos, orcamento_nos)
+        guardado = CacheResultados(DIRETORIO_CACHE).ler(endereco)
+        if guardado is not None:
+            return guardado
+
+    if armazem is not None and seed in armazem:
+        # Mundo lido do armazém, sem regenerar nada
+        maze = Maze(seed, visual=VISUAL, layout=armazem.layout(seed))
+    else:
+        maze = Maze(seed, visual=VISUAL)
+    maze.manter_janela = False  # Na varredura cada janela fecha ao fim da reprodução
+
+    # Configura o player com a estratégia e a profundidade desejadas
+    if jogador != 'foresight':
+        maze.world.player = JOGADORES[jogador](maze.world.player.position)
     maze.world.player.M = profundidade  # Ajusta a profundidade de previsão
     maze.world.player.recalcular_por_movimento = recalcular_por_movimento  # Ajusta a configuração de recalcular por movimento
+    if largura_feixe:
+        maze.world.player.largura_feixe = largura_feixe  # Sequências mantidas por nível na busca em feixe
+    if iteracoes_mcts:
+        maze.world.player.iteracoes = iteracoes_mcts  # Orçamento de iterações por decisão do MCTS
+    if orcamento_nos:
+        maze.world.player.orcamento_nos = orcamento_nos  # Profundidade por decisão (até 'profundidade') pelo número de nós previsto
+    if armazem is not None and seed in armazem and hasattr(maze.world.player, 'tabela'):
+        # Trechos entre pontos de interesse já calculados, sem refazer o A*
+        maze.world.player.tabela = armazem.tabela(seed)
     # Executa o jogo
+    preparacao = time.time() - inicio
     maze.game_loop()
     
-    # Coleta métricas
+    # Coleta métricas (medidas por Maze._simular, sem o tempo de reprodução da janela)
+    metricas = maze.metricas
     dados = {
         'seed': seed,
+        'jogador': jogador,
         'profundidade': profundidade,
-        'pontuacao': maze.score,
-        'passos': maze.steps,
-        'bateria_final': maze.world.player.battery,
-        'recargas': maze.recargas,  # Certifique-se de que a classe Maze tem este atributo
-        'tempo_execucao': time.time() - inicio
+        'largura_feixe': largura_feixe,
+        'iteracoes_mcts': iteracoes_mcts,
+        'orcamento_nos': orcamento_nos,
+        'pontuacao': metricas['pontuacao'],
+        'passos': metricas['passos'],
+        'bateria_final': metricas['bateria_final'],
+        'recargas': metricas['recargas'],
+        'tempo_execucao': preparacao + metricas['tempo_simulacao'],
+        # Expansões mantidas e descartadas por regra de poda, por nível da árvore (JSON)
+        'nos_gerados': json.dumps(getattr(maze.world.player, 'nos_gerados', {})),
+        'podas': json.dumps(getattr(maze.world.player, 'contadores_poda', {})),
+        # [profundidade usada, nós previstos, nós gerados] de cada decisão (JSON)
+        'decisoes': json.dumps(getattr(maze.world.player, 'decisoes', [])),
     }
+    if DIRETORIO_CACHE is not None:
+        CacheResultados(DIRETORIO_CACHE).gravar(endereco, dados)
     
     return dados
 
@@ -30,12 +85,36 @@ def executar_simulacao(seed, profundidade, recalcular_por_movimento):
 NUM_SEEDS = 10000
 PROFUNDIDADES = list(range(1, 5))  # 1 a 7
 RECALCULAR_POR_MOVIMENTO = True  # Definido como True para recalcular por movimento
+# Estratégias simuladas (chaves de main.JOGADORES); as que não usam profundidade rodam uma vez, com profundidade 0
+JOGADORES_SIMULADOS = ['foresight']
+USAM_PROFUNDIDADE = {'foresight', 'feixe'}
+LARGURAS_FEIXE = [4, 16, 64]  # Larguras varridas para o jogador 'feixe', junto com PROFUNDIDADES
+ITERACOES_MCTS = [25, 100, 400]  # Orçamentos por decisão varridos para o jogador 'mcts'
+# Orçamentos de nós por decisão do jogador 'foresight' (0 = profundidade fixa); com
+# orçamento, PROFUNDIDADES passa a ser a profundidade máxima de cada decisão
+ORCAMENTOS_NOS = [0]
+ARQUIVO_RESULTADOS = 'resultadosBIGSIM4depth10000seedssmart.csv'
+VISUAL = False  # Abre a janela do pygame em cada simulação (não altera métricas nem tempos)
+# Mundos gerados em lote (geracao.py) em vez de World(seed); atenção: os layouts
+# em lote são diferentes dos de World(seed), usados nos CSVs existentes
+MUNDOS_EM_LOTE = False
 seeds = list(range(1, NUM_SEEDS + 1))  # Seeds fixos de 1 a 100
+# Arquivo com mundos e trechos pré-calculados, compartilhado pelos workers (None desativa);
+# o nome gravado recebe a versão do código, ver armazem.caminho_versionado
+ARQUIVO_ARMAZEM = f"armazem{NUM_SEEDS}seeds{'lote' if MUNDOS_EM_LOTE else ''}.npy"
+# Diretório de resultados já calculados, por configuração e versão do código (None
+# desativa). Resultados lidos do cache trazem o tempo_execucao da execução que os
+# calculou: deixe desativado em varreduras usadas para medir tempo
+DIRETORIO_CACHE = None
+# 'processos' (ProcessPoolExecutor) ou 'threads' (ThreadPoolExecutor no mesmo processo,
+# sem pickling; só é paralelo de fato em builds free-threaded do Python). Com
+# threads, VISUAL deve ser False: o pygame só desenha na thread principal
+EXECUCAO = 'processos'
 
 # Função auxiliar para execução paralela
-def executar_tarefa(seed, profundidade, recalcular_por_movimento):
+def executar_tarefa(seed, profundidade, recalcular_por_movimento, jogador='foresight', largura_feixe=0, iteracoes_mcts=0, orcamento_nos=0):
     try:
-        return executar_simulacao(seed, profundidade, recalcular_por_movimento)
+        return executar_simulacao(seed, profundidade, recalcular_por_movimento, jogador, largura_feixe, iteracoes_mcts, orcamento_nos)
     except Exception as e:
         print(f'Erro na seed {seed}, profundidade {profundidade}: {str(e)}')
         return None
@@ -44,17 +123,54 @@ def executar_tarefa_wrapper(args):
     """Wrapper para desempacotar os argumentos e chamar executar_tarefa."""
     return executar_tarefa(*args)
 
+def arquivo_resultados(resultado):
+    """
+    Um CSV por configuração (estratégia, largura do feixe e orçamento do MCTS),
+    para que os scripts de gráficos, que agrupam por profundidade, possam
+    comparar as configurações.
+    """
+    jogador = resultado['jogador']
+    if jogador == 'foresight':
+        if resultado.get('orcamento_nos'):
+            return ARQUIVO_RESULTADOS.replace('.csv', f"_orcamento{resultado['orcamento_nos']}.csv")
+        return ARQUIVO_RESULTADOS
+    parametro = resultado['largura_feixe'] or resultado['iteracoes_mcts']
+    sufixo = f"{jogador}{parametro}" if parametro else jogador
+    return ARQUIVO_RESULTADOS.replace('.csv', f'_{sufixo}.csv')
+
+def montar_tarefas():
+    """Grade de tarefas da configuração acima (combinações de estratégia, seed, profundidade e parâmetros do planejador)."""
+    return [
+        (seed, profundidade, RECALCULAR_POR_MOVIMENTO, jogador, largura_feixe, iteracoes_mcts, orcamento_nos)
+        for jogador in JOGADORES_SIMULADOS
+        for seed in seeds
+        for profundidade in (PROFUNDIDADES if jogador in USAM_PROFUNDIDADE else [0])
+        for largura_feixe in (LARGURAS_FEIXE if jogador == 'feixe' else [0])
+        for iteracoes_mcts in (ITERACOES_MCTS if jogador == 'mcts' else [0])
+        for orcamento_nos in (ORCAMENTOS_NOS if jogador == 'foresight' else [0])
+    ]
+
+def gravar_resultados(resultados):
+    """Grava os resultados, à medida que chegam, no CSV de cada configuração."""
+    campos = ['seed', 'jogador', 'profundidade', 'largura_feixe', 'iteracoes_mcts', 'orcamento_nos', 'pontuacao', 'passos', 'bateria_final', 'recargas', 'tempo_execucao', 'nos_gerados', 'podas', 'decisoes']
+    with ExitStack() as arquivos:
+        escritores = {}
+        for resultado in resultados:
+            if not resultado:  # Apenas escreve resultados válidos
+                continue
+            nome = arquivo_resultados(resultado)
+            if nome not in escritores:
+                arquivo = arquivos.enter_context(open(nome, 'w', newline=''))
+                escritores[nome] = csv.DictWriter(arquivo, fieldnames=campos)
+                escritores[nome].writeheader()
+            escritores[nome].writerow(resultado)
+
 if __name__ == "__main__":
-    with open('resultadosBIGSIM4depth10000seedssmart.csv', 'w', newline='') as arquivo:
-        campos = ['seed', 'profundidade', 'pontuacao', 'passos', 'bateria_final', 'recargas', 'tempo_execucao']
-        escritor = csv.DictWriter(arquivo, fieldnames=campos)
-        escritor.writeheader()
-        
-        # Cria uma lista de tarefas (combinações de seed e profundidade)
-        tarefas = [(seed, profundidade, RECALCULAR_POR_MOVIMENTO) for seed in seeds for profundidade in PROFUNDIDADES]
-        
-        # Executa as tarefas em paralelo
-        with ProcessPoolExecutor() as executor:
-            for resultado in executor.map(executar_tarefa_wrapper, tarefas):
-                if resultado:  # Apenas escreve resultados válidos
-                    escritor.writerow(resultado)
\ No newline at end of file
+    if ARQUIVO_ARMAZEM is not None:
+        # Etapa prévia: grava (ou reaproveita) o armazém antes de iniciar os workers
+        escrever_armazem(seeds, ARQUIVO_ARMAZEM, lote=MUNDOS_EM_LOTE)
+
+    # Executa as tarefas em paralelo
+    Executor = ThreadPoolExecutor if EXECUCAO == 'threads' else ProcessPoolExecutor
+    with Executor() as executor:
+        gravar_resultados(executor.map(executar_tarefa_wrapper, montar_tarefas()))